@@ -0,0 +1,7 @@
+"""
+Código compartido entre etapas del pipeline: formatos de los logs HTTP
+(compresión y columnar .cols) que escribe 02_simulation_logs y lee
+03_kpi_processing.
+
+Se instala con `pip install -e 00_common` (incluido en requirements.txt).
+"""
@@ -0,0 +1,177 @@
+"""
+Formato columnar binario para los logs HTTP (directorio `*.cols`).
+
+Estructura:
+    http_logs.cols/
+        meta.json            # filas, dtype y codificación de cada columna
+        timestamp_utc.bin    # int64, epoch en milisegundos UTC (NaT = mínimo int64)
+        endpoint.bin         # int32, código en el diccionario de meta.json (-1 = nulo)
+        http_method.bin      # int32, diccionario
+        status_code.bin      # int16
+        elapsed_ms.bin       # float64
+        parse_result.bin     # int32, diccionario
+        user_agent.bin       # int32, diccionario
+
+Cada .bin es un array plano little-endian que se abre con np.memmap, así que
+la carga no parsea nada: pandas recibe vistas de los archivos y los strings
+de baja cardinalidad llegan como Categorical (códigos + diccionario).
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .compresion import JsonlReader
+
+FORMAT_NAME = "http_logs_columnar"
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+SCHEMA = {
+    "timestamp_utc": ("<i8", "epoch_ms"),
+    "endpoint": ("<i4", "dictionary"),
+    "http_method": ("<i4", "dictionary"),
+    "status_code": ("<i2", "plain"),
+    "elapsed_ms": ("<f8", "plain"),
+    "parse_result": ("<i4", "dictionary"),
+    "user_agent": ("<i4", "dictionary"),
+}
+CONVERT_CHUNK = 200_000
+
+
+def is_columnar(path: Path) -> bool:
+    return path.is_dir() and (path / META_FILE).exists()
+
+
+class ColumnarWriter:
+    """
+    Escribe bloques de columnas añadiéndolos a los .bin. Los diccionarios solo
+    crecen (append-only), así que los códigos ya escritos siguen siendo válidos.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self.dictionaries = {name: {} for name, (_, enc) in SCHEMA.items() if enc == "dictionary"}
+        self.files = {name: open(self.path / f"{name}.bin", "wb") for name in SCHEMA}
+
+    def encode(self, name, values) -> np.ndarray:
+        """Códigos de `values` en el diccionario de la columna (None → -1)."""
+        table = self.dictionaries[name]
+        inverse, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        mapping = np.array([table.setdefault(v, len(table)) for v in uniques], dtype=np.int32)
+        return np.where(inverse >= 0, mapping[inverse] if len(mapping) else -1, -1).astype(np.int32)
+
+    def append(self, columns: dict):
+        """Añade un bloque: diccionario nombre → array ya en el dtype del esquema."""
+        sizes = {len(columns[name]) for name in SCHEMA}
+        if len(sizes) != 1:
+            raise ValueError(f"Columnas de distinto tamaño en el bloque: {sizes}")
+        for name, (dtype, _) in SCHEMA.items():
+            np.asarray(columns[name], dtype=dtype).tofile(self.files[name])
+        self.rows += sizes.pop()
+
+    def close(self, commit=True):
+        """Cierra los .bin; meta.json solo se escribe si la escritura terminó bien."""
+        for f in self.files.values():
+            f.close()
+        if not commit:
+            return
+        columns = {}
+        for name, (dtype, encoding) in SCHEMA.items():
+            spec = {"dtype": dtype, "encoding": encoding}
+            if encoding == "dictionary":
+                spec["values"] = list(self.dictionaries[name])
+            columns[name] = spec
+        meta = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "rows": self.rows, "columns": columns}
+        (self.path / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
+
+
+def load_columnar(path: Path, columns=None) -> pd.DataFrame:
+    """
+    Carga un directorio .cols con memory-mapping: numéricos y timestamps son
+    vistas sobre los archivos y los diccionarios se convierten en Categorical.
+    """
+    path = Path(path)
+    meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+    if meta.get("format") != FORMAT_NAME or meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Formato columnar no soportado en {path}: {meta.get('format')} v{meta.get('version')}")
+
+    rows = meta["rows"]
+    data = {}
+    for name, spec in meta["columns"].items():
+        if columns is not None and name not in columns:
+            continue
+        if rows:
+            values = np.memmap(path / f"{name}.bin", dtype=spec["dtype"], mode="r", shape=(rows,))
+        else:
+            values = np.empty(0, dtype=spec["dtype"])
+        if spec["encoding"] == "dictionary":
+            data[name] = pd.Categorical.from_codes(values, categories=spec["values"])
+        elif spec["encoding"] == "epoch_ms":
+            data[name] = pd.Series(values.view("datetime64[ms]"), copy=False).dt.tz_localize("UTC")
+        else:
+            data[name] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def convert_jsonl(input_path: Path, output_path: Path, chunk_size=CONVERT_CHUNK) -> int:
+    """Convierte un JSONL (plano o comprimido) a .cols por bloques de `chunk_size` líneas."""
+    reader = JsonlReader(Path(input_path))
+    started = time.perf_counter()
+
+    def flush(writer, records):
+        block = pd.DataFrame.from_records(records)
+        if "cache" in block.columns:
+            # Respuestas servidas por la caché HTTP: no son tráfico real
+            block = block[block["cache"].isna()]
+        block = block.reindex(columns=list(SCHEMA))
+        ts = pd.to_datetime(block["timestamp_utc"], utc=True, errors="coerce", format="ISO8601")
+        writer.append({
+            "timestamp_utc": ts.dt.as_unit("ms").astype("int64"),
+            "endpoint": writer.encode("endpoint", block["endpoint"]),
+            "http_method": writer.encode("http_method", block["http_method"]),
+            "status_code": block["status_code"],
+            "elapsed_ms": pd.to_numeric(block["elapsed_ms"], errors="coerce"),
+            "parse_result": writer.encode("parse_result", block["parse_result"]),
+            "user_agent": writer.encode("user_agent", block["user_agent"]),
+        })
+
+    with ColumnarWriter(output_path) as writer:
+        records = []
+        for line_num, line in enumerate(reader, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON mal formado en línea {line_num}: {e}")
+            if len(records) >= chunk_size:
+                flush(writer, records)
+                records = []
+        if records:
+            flush(writer, records)
+
+    print(f"⏱️ Lectura: {reader.summary()}")
+    print(f"✅ {writer.rows} registros convertidos en {time.perf_counter() - started:.2f}s → {output_path}")
+    return writer.rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte logs JSONL al formato columnar .cols")
+    parser.add_argument("--input", required=True, help="JSONL de entrada (.gz/.bz2/.xz/.zst admitidos)")
+    parser.add_argument("--output", required=True, help="Directorio .cols de salida")
+    parser.add_argument("--chunk-size", type=int, default=CONVERT_CHUNK, help="Líneas por bloque")
+    args = parser.parse_args()
+    convert_jsonl(Path(args.input), Path(args.output), args.chunk_size)
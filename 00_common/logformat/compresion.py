@@ -0,0 +1,110 @@
+"""
+Lectura incremental y escritura de JSONL comprimido según la extensión del archivo.
+
+.gz / .bz2 / .xz usan la librería estándar; .zst requiere el paquete opcional
+`zstandard`. Cualquier otra extensión se trata sin comprimir. Los archivos
+multi-miembro (shards concatenados) se leen enteros.
+
+Lo usan 02_simulation_logs/generar_datos.py para escribir su salida y
+03_kpi_processing para leerla.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import time
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+READ_BUFFER = 1 << 20
+
+# Niveles de escritura: equilibrio entre ratio y velocidad para logs de texto
+GZIP_LEVEL = 6
+BZ2_LEVEL = 9
+XZ_PRESET = 3
+ZSTD_LEVEL = 3
+
+
+def compression_for(path):
+    """Nombre del algoritmo según la extensión, o None si no está comprimido."""
+    return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def open_output(path, threads=0):
+    """
+    Abre `path` en modo binario de escritura con el compresor de su extensión.
+    Con zstd, `threads` > 0 (o -1 = núcleos disponibles) comprime en paralelo.
+    """
+    kind = compression_for(path)
+    if kind == "gzip":
+        return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+    if kind == "bz2":
+        return bz2.open(path, "wb", compresslevel=BZ2_LEVEL)
+    if kind == "xz":
+        return lzma.open(path, "wb", preset=XZ_PRESET)
+    if kind == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("La salida .zst requiere el paquete 'zstandard' (pip install zstandard)")
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=threads)
+        return compressor.stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+def _decompressing_reader(raw, kind):
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if kind == "bz2":
+        return bz2.BZ2File(raw, mode="rb")
+    if kind == "xz":
+        return lzma.LZMAFile(raw, mode="rb")
+    if kind == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("La entrada .zst requiere el paquete 'zstandard' (pip install zstandard)")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        return io.BufferedReader(reader, READ_BUFFER)
+    return raw
+
+
+class JsonlReader:
+    """
+    Itera las líneas (bytes) de un JSONL, descomprimiendo por bloques: nunca
+    hay una copia completa descomprimida en memoria. Acumula bytes leídos del
+    disco, bytes descomprimidos y líneas para informar del throughput.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.compression = compression_for(path)
+        self.raw_bytes = 0
+        self.bytes = 0
+        self.lines = 0
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        started = time.perf_counter()
+        with open(self.path, "rb", buffering=READ_BUFFER) as raw:
+            stream = _decompressing_reader(raw, self.compression)
+            try:
+                for line in stream:
+                    self.lines += 1
+                    self.bytes += len(line)
+                    yield line
+            finally:
+                self.raw_bytes = raw.tell()
+                if stream is not raw:
+                    stream.close()
+                self.elapsed = time.perf_counter() - started
+
+    def summary(self):
+        mb = 1024 * 1024
+        secs = max(self.elapsed, 1e-9)
+        text = (f"{self.lines:,} líneas, {self.bytes / mb:.1f} MB en {self.elapsed:.2f}s "
+                f"({self.bytes / mb / secs:.1f} MB/s, {self.lines / secs:,.0f} líneas/s)")
+        if self.compression:
+            ratio = self.bytes / self.raw_bytes if self.raw_bytes else 0.0
+            text += (f" | {self.compression}: {self.raw_bytes / mb:.1f} MB leídos del disco "
+                     f"({self.raw_bytes / mb / secs:.1f} MB/s, ratio {ratio:.1f}x)")
+        return text
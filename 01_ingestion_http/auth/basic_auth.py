@@ -1,15 +1,8 @@
 import os
 from requests.auth import HTTPBasicAuth
+from common.config import BASE_URL
 from common.http_session import create_session
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    # dotenv is optional; if not installed, fall back to environment variables
-    pass
-
-BASE_URL = os.getenv("INGESTION_BASE_URL", "https://httpbin.org")
 USERNAME = os.getenv("INGESTION_BASIC_USER")
 PASSWORD = os.getenv("INGESTION_BASIC_PASS")
 
@@ -0,0 +1,19 @@
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    # dotenv is optional; if not installed, fall back to environment variables
+    pass
+
+# Servidor local de reemplazo (local_server/server.py)
+LOCAL_BASE_URL = os.getenv("INGESTION_LOCAL_URL", "http://127.0.0.1:8080").rstrip("/")
+
+# Interruptor único: INGESTION_TARGET=local apunta todos los escenarios al servidor local;
+# si no, se usa INGESTION_BASE_URL (por defecto httpbin.org)
+TARGET = os.getenv("INGESTION_TARGET", "remote").lower()
+if TARGET == "local":
+    BASE_URL = LOCAL_BASE_URL
+else:
+    BASE_URL = os.getenv("INGESTION_BASE_URL", "https://httpbin.org").rstrip("/")
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Cabeceras que no se guardan: el cuerpo se almacena ya decodificado
+_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+# Cabeceras que un 304 puede actualizar en la entrada guardada
+_REFRESH_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date")
+
+
+def parse_cache_control(value):
+    """Convierte 'max-age=60, no-cache' en {'max-age': '60', 'no-cache': None}."""
+    directives = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, arg = item.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _vary_names(headers):
+    """Cabeceras de la petición de las que depende la respuesta (Vary), en minúsculas."""
+    return sorted({name.strip().lower() for name in (headers.get("Vary") or "").split(",") if name.strip()})
+
+
+def _max_age(headers):
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in directives:
+        return 0
+    try:
+        return max(int(directives.get("max-age") or 0), 0)
+    except ValueError:
+        return 0
+
+
+class _CacheEntry:
+    def __init__(self, key, meta):
+        self.key = key
+        self.url = meta["url"]
+        self.headers = meta["headers"]
+        self.stored_at = meta["stored_at"]
+        self.size = meta["size"]
+        self.vary = meta.get("vary", {})
+
+    def matches(self, request):
+        """La entrada solo sirve si la petición repite los valores de las cabeceras de Vary."""
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def is_fresh(self, now=None):
+        age = (now or time.time()) - self.stored_at
+        return age < _max_age(CaseInsensitiveDict(self.headers))
+
+    def conditional_headers(self):
+        headers = CaseInsensitiveDict(self.headers)
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def to_meta(self):
+        return {"url": self.url, "headers": self.headers, "stored_at": self.stored_at, "size": self.size,
+                "vary": self.vary}
+
+
+class _FileBody:
+    """Cuerpo servido desde disco; se cierra solo al llegar al final."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+
+    def read(self, amt=None):
+        data = self._f.read(-1 if amt is None else amt)
+        if not data:
+            self._f.close()
+        return data
+
+    def close(self):
+        self._f.close()
+
+
+class _TeeBody:
+    """
+    Envuelve el raw de una respuesta en streaming: copia a un temporal lo que el
+    consumidor va leyendo y lo guarda en caché solo si el cuerpo se leyó completo.
+    """
+
+    def __init__(self, raw, tmp_path, on_complete):
+        self._raw = raw
+        self._tmp_path = tmp_path
+        self._tmp = open(tmp_path, "wb")
+        self._on_complete = on_complete
+
+    def read(self, amt=None, **kwargs):
+        data = self._raw.read(amt, decode_content=True)
+        if self._tmp is None:
+            return data
+        if data:
+            self._tmp.write(data)
+        else:
+            self._tmp.close()
+            self._tmp = None
+            self._on_complete(self._tmp_path)
+        return data
+
+    def close(self):
+        if self._tmp is not None:
+            self._tmp.close()
+            self._tmp = None
+            self._tmp_path.unlink(missing_ok=True)
+        self._raw.close()
+
+    def release_conn(self):
+        self._raw.release_conn()
+
+
+class HttpCache:
+    """
+    Caché HTTP en disco (cuerpo + cabeceras) con revalidación condicional
+    (ETag / Last-Modified), frescura por Cache-Control max-age y expulsión LRU
+    por tamaño total. Es seguro compartirla entre hilos.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> tamaño, en orden de uso (LRU primero)
+        self._total = 0
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+        self._load_index()
+
+    def _load_index(self):
+        bodies = sorted(self.directory.glob("*.body"), key=lambda p: p.stat().st_mtime)
+        for body in bodies:
+            size = body.stat().st_size
+            self._index[body.stem] = size
+            self._total += size
+
+    def _paths(self, key):
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable_request(request):
+        # Con Cookie la respuesta puede depender de la sesión: como con Authorization, no se cachea
+        return (
+            request.method == "GET"
+            and "Authorization" not in request.headers
+            and "Cookie" not in request.headers
+            and "Range" not in request.headers
+        )
+
+    @staticmethod
+    def is_storable(response):
+        headers = response.headers
+        directives = parse_cache_control(headers.get("Cache-Control"))
+        if response.status_code != 200 or "no-store" in directives or headers.get("Vary") == "*":
+            return False
+        # Una respuesta servida desde disco no aplica Set-Cookie a la sesión
+        if "Set-Cookie" in headers:
+            return False
+        # Sin validadores ni max-age no habría forma de reutilizarla
+        return "ETag" in headers or "Last-Modified" in headers or _max_age(headers) > 0
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._index), bytes=self._total)
+
+    # ---------------- lectura ----------------
+    def lookup(self, request):
+        """Entrada guardada para la URL de `request`, o None si falta o es de otra variante (Vary)."""
+        key = self.key_for(request.url)
+        body_path, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._index:
+                return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._discard(key)
+            return None
+        entry = _CacheEntry(key, meta)
+        return entry if entry.matches(request) else None
+
+    def _touch(self, key):
+        body_path, _ = self._paths(key)
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def build_response(self, entry, request, adapter, status):
+        """Construye una Response servida desde disco; X-Cache indica HIT o REVALIDATED."""
+        body_path, _ = self._paths(entry.key)
+        self._touch(entry.key)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.headers["X-Cache"] = status
+        # Marca propia (un X-Cache puede venir también del servidor o de una CDN)
+        response.cache_status = status
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _FileBody(body_path)
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        return response
+
+    # ---------------- escritura ----------------
+    def _stored_headers(self, response):
+        return {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS}
+
+    def store(self, response, body):
+        key = self.key_for(response.request.url)
+        body_path, _ = self._paths(key)
+        tmp = body_path.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_bytes(body)
+        self._commit(key, response, tmp)
+
+    def tee(self, response):
+        """Sustituye response.raw para guardar el cuerpo a medida que se consume."""
+        key = self.key_for(response.request.url)
+        body_path, _ = self._paths(key)
+        tmp = body_path.with_suffix(f".tmp{threading.get_ident()}")
+        response.raw = _TeeBody(response.raw, tmp, lambda path: self._commit(key, response, path))
+
+    def _commit(self, key, response, tmp_path):
+        body_path, meta_path = self._paths(key)
+        size = tmp_path.stat().st_size
+        meta = {
+            "url": response.request.url,
+            "headers": self._stored_headers(response),
+            "stored_at": time.time(),
+            "size": size,
+            "vary": {name: response.request.headers.get(name) for name in _vary_names(response.headers)},
+        }
+        if size > self.max_bytes:
+            tmp_path.unlink(missing_ok=True)
+            return
+        os.replace(tmp_path, body_path)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self.counters["stored"] += 1
+        self._evict()
+
+    def refresh(self, entry, response):
+        """Tras un 304, actualiza validadores y frescura de la entrada."""
+        _, meta_path = self._paths(entry.key)
+        for name in _REFRESH_HEADERS:
+            if name in response.headers:
+                for stored in [k for k in entry.headers if k.lower() == name.lower()]:
+                    del entry.headers[stored]
+                entry.headers[name] = response.headers[name]
+        entry.stored_at = time.time()
+        meta_path.write_text(json.dumps(entry.to_meta()), encoding="utf-8")
+
+    def _discard(self, key):
+        with self._lock:
+            self._total -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self._total <= self.max_bytes or not self._index:
+                    return
+                key, size = self._index.popitem(last=False)
+                self._total -= size
+                self.counters["evicted"] += 1
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
@@ -1,9 +1,232 @@
+import os
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.http_cache import HttpCache
+from common.rate_limit import THROTTLE_STATUS, RateLimiter, parse_retry_after
+from common.request_log import log_response
+
+USER_AGENT = "Mozilla/5.0 (X11; CrOS x86_64 8172.45.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.64 Safari/537.36"
+
+# Parámetros del pool compartido (sobrescribibles por variables de entorno)
+POOL_CONNECTIONS = int(os.getenv("INGESTION_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("INGESTION_POOL_MAXSIZE", "10"))
+MAX_RETRIES = int(os.getenv("INGESTION_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("INGESTION_BACKOFF_FACTOR", "0.5"))
+CONNECT_TIMEOUT = float(os.getenv("INGESTION_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("INGESTION_READ_TIMEOUT", "30"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Con limitador, 429/503 se reintentan por encima de él (no dentro de urllib3)
+# para que cada intento pase por el token bucket y alimente el AIMD
+LIMITED_RETRY_STATUS = tuple(s for s in RETRY_STATUS if s in THROTTLE_STATUS)
+# Caché HTTP en disco (INGESTION_CACHE=0 la desactiva)
+CACHE_ENABLED = os.getenv("INGESTION_CACHE", "1") == "1"
+CACHE_DIR = os.getenv("INGESTION_CACHE_DIR", "out/http_cache")
+CACHE_MAX_MB = float(os.getenv("INGESTION_CACHE_MAX_MB", "100"))
+# Limitador adaptativo por host (INGESTION_RATE_LIMIT=0 lo desactiva)
+RATE_LIMIT_ENABLED = os.getenv("INGESTION_RATE_LIMIT", "1") == "1"
+INITIAL_RATE = float(os.getenv("INGESTION_INITIAL_RATE", "50"))
+MAX_RATE = float(os.getenv("INGESTION_MAX_RATE", "500"))
+MIN_RATE = 0.5
+
+_settings = {
+    "pool_connections": POOL_CONNECTIONS,
+    "pool_maxsize": POOL_MAXSIZE,
+    "max_retries": MAX_RETRIES,
+    "backoff_factor": BACKOFF_FACTOR,
+    "timeout": (CONNECT_TIMEOUT, READ_TIMEOUT),
+    "cache_dir": CACHE_DIR if CACHE_ENABLED else None,
+    "cache_max_mb": CACHE_MAX_MB,
+    "rate_limit": RATE_LIMIT_ENABLED,
+    "initial_rate": INITIAL_RATE,
+    "max_rate": MAX_RATE,
+}
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que aplica un timeout (connect, read) cuando la llamada no indica uno.
+    Si tiene caché, sirve desde disco las respuestas frescas y revalida el resto
+    con If-None-Match / If-Modified-Since; si tiene limitador, cada petición que
+    sale a la red pasa antes por el token bucket de su host (también cada
+    reintento de un 429/503).
+    """
+
+    def __init__(self, timeout=None, cache=None, limiter=None, throttle_retries=0, backoff_factor=0.0, **kwargs):
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = limiter
+        self.throttle_retries = throttle_retries
+        self.backoff_factor = backoff_factor
+        super().__init__(**kwargs)
+
+    def _send_limited(self, host, request, **kwargs):
+        host.acquire()
+        status = retry_after = None
+        try:
+            response = super().send(request, **kwargs)
+            status = response.status_code
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return response, retry_after
+        finally:
+            host.release(status, retry_after)
+
+    def _send_network(self, request, **kwargs):
+        if self.limiter is None:
+            return super().send(request, **kwargs)
+        host = self.limiter.for_url(request.url)
+        retries = self.throttle_retries if request.method in Retry.DEFAULT_ALLOWED_METHODS else 0
+        attempt = 0
+        while True:
+            response, retry_after = self._send_limited(host, request, **kwargs)
+            if response.status_code not in LIMITED_RETRY_STATUS or attempt >= retries:
+                return response
+            response.close()
+            # Con Retry-After el host ya queda bloqueado hasta que vence; sin él, backoff exponencial
+            if not retry_after:
+                time.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        cache = self.cache
+        if cache is None or not cache.is_cacheable_request(request):
+            return self._send_network(request, timeout=timeout, **kwargs)
+
+        entry = cache.lookup(request)
+        if entry is not None and entry.is_fresh():
+            try:
+                response = cache.build_response(entry, request, self, "HIT")
+                cache.count("hits")
+                return response
+            except OSError:
+                entry = None
+        if entry is not None:
+            request.headers.update(entry.conditional_headers())
+
+        response = self._send_network(request, timeout=timeout, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            try:
+                cached = cache.build_response(entry, request, self, "REVALIDATED")
+            except OSError:
+                cached = None
+            if cached is not None:
+                cache.refresh(entry, response)
+                cache.count("revalidated")
+                response.close()
+                return cached
+            # El cuerpo guardado ya no se puede leer: se repite la petición sin condiciones
+            response.close()
+            for name in entry.conditional_headers():
+                request.headers.pop(name, None)
+            response = self._send_network(request, timeout=timeout, **kwargs)
+
+        cache.count("misses")
+        if cache.is_storable(response):
+            if kwargs.get("stream"):
+                cache.tee(response)
+            else:
+                cache.store(response, response.content)
+        return response
+
+
+def configure_session(**overrides):
+    """
+    Ajusta los parámetros del adapter compartido (pool_connections, pool_maxsize,
+    max_retries, backoff_factor, timeout, cache_dir, cache_max_mb, rate_limit,
+    initial_rate, max_rate).
+    Solo tiene efecto antes del primer uso.
+    """
+    unknown = set(overrides) - set(_settings)
+    if unknown:
+        raise ValueError(f"Parámetros de sesión desconocidos: {sorted(unknown)}")
+    with _adapter_lock:
+        if _adapter is not None:
+            raise RuntimeError("La sesión compartida ya está en uso; configúrala antes de la primera petición.")
+        _settings.update(overrides)
+
+
+def get_adapter():
+    """Devuelve el adapter del proceso; su pool de conexiones lo comparten todos los hilos."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            status_forcelist = RETRY_STATUS
+            if _settings["rate_limit"]:
+                status_forcelist = tuple(s for s in RETRY_STATUS if s not in LIMITED_RETRY_STATUS)
+            retries = Retry(
+                total=_settings["max_retries"],
+                backoff_factor=_settings["backoff_factor"],
+                status_forcelist=status_forcelist,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            cache = None
+            if _settings["cache_dir"]:
+                cache = HttpCache(_settings["cache_dir"], int(_settings["cache_max_mb"] * 1024 * 1024))
+            limiter = None
+            if _settings["rate_limit"]:
+                limiter = RateLimiter(
+                    rate=_settings["initial_rate"],
+                    min_rate=MIN_RATE,
+                    max_rate=_settings["max_rate"],
+                    max_inflight=_settings["pool_maxsize"],
+                )
+            _adapter = PooledHTTPAdapter(
+                timeout=_settings["timeout"],
+                cache=cache,
+                limiter=limiter,
+                throttle_retries=_settings["max_retries"],
+                backoff_factor=_settings["backoff_factor"],
+                pool_connections=_settings["pool_connections"],
+                pool_maxsize=_settings["pool_maxsize"],
+                max_retries=retries,
+            )
+        return _adapter
+
 
 # Crea y configura una sesión HTTP con un User-Agent personalizado.
+# Cada respuesta pasa por el hook que registra su latencia (common.request_log).
 def create_session():
     session = requests.Session()
     session.headers.update({
-        "User-Agent": "Mozilla/5.0 (X11; CrOS x86_64 8172.45.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.64 Safari/537.36"
+        "User-Agent": USER_AGENT
     })
-    return session
\ No newline at end of file
+    session.hooks["response"].append(log_response)
+    adapter = get_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_cache():
+    """Caché HTTP compartida, o None si está desactivada."""
+    return get_adapter().cache
+
+
+def get_rate_limiter():
+    """Limitador por host compartido, o None si está desactivado."""
+    return get_adapter().limiter
+
+
+def get_session():
+    """
+    Sesión del hilo actual. Cada hilo tiene su propio estado (cookies, headers),
+    pero todas reutilizan el mismo pool de conexiones keep-alive.
+    Pensada para los workers de un pool creado por un escenario; cada run() de
+    escenario usa create_session() para empezar con el cookie jar vacío.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = create_session()
+        _local.session = session
+    return session
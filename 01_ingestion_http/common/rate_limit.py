@@ -0,0 +1,118 @@
+import email.utils
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Respuestas que indican bloqueo o limitación por parte del servidor
+THROTTLE_STATUS = (403, 429, 503)
+
+
+def parse_retry_after(value, now=None):
+    """Segundos de espera indicados por Retry-After (entero o fecha HTTP), o None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(when - (now or time.time()), 0.0)
+
+
+class HostLimiter:
+    """
+    Token bucket de un host con control AIMD: cada respuesta correcta suma
+    `increase` req/s a la tasa y un poco al límite de concurrencia; cada
+    403/429/503 los multiplica por `decrease`. Retry-After bloquea el host
+    hasta que vence.
+    """
+
+    def __init__(self, rate, min_rate, max_rate, max_inflight, increase=1.0, decrease=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_inflight = max_inflight
+        self.limit = float(max_inflight)
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = 1.0
+        self.inflight = 0
+        self.blocked_until = 0.0
+        self.counters = {"requests": 0, "throttled": 0, "waits": 0}
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        burst = max(self.rate, 1.0)
+        self.tokens = min(self.tokens + (now - self._updated) * self.rate, burst)
+        self._updated = now
+
+    def acquire(self):
+        with self._cond:
+            waited = False
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.inflight >= int(self.limit):
+                    wait = None
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    break
+                waited = True
+                self._cond.wait(wait)
+            self.tokens -= 1
+            self.inflight += 1
+            self.counters["requests"] += 1
+            if waited:
+                self.counters["waits"] += 1
+
+    def release(self, status=None, retry_after=None):
+        with self._cond:
+            self.inflight -= 1
+            if status in THROTTLE_STATUS:
+                self.counters["throttled"] += 1
+                self.rate = max(self.rate * self.decrease, self.min_rate)
+                self.limit = max(self.limit * self.decrease, 1.0)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif status is not None and status < 500:
+                self.rate = min(self.rate + self.increase, self.max_rate)
+                self.limit = min(self.limit + 1.0 / self.limit, float(self.max_inflight))
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return dict(
+                self.counters,
+                rate=round(self.rate, 2),
+                concurrency=int(self.limit),
+                inflight=self.inflight,
+            )
+
+
+class RateLimiter:
+    """Un HostLimiter por host (scheme://host:port), creado al primer uso."""
+
+    def __init__(self, rate, min_rate, max_rate, max_inflight):
+        self.settings = {"rate": rate, "min_rate": min_rate, "max_rate": max_rate, "max_inflight": max_inflight}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = self._hosts[host] = HostLimiter(**self.settings)
+            return limiter
+
+    def stats(self):
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limiter.stats() for host, limiter in hosts.items()}
@@ -0,0 +1,139 @@
+import atexit
+import json
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Log de peticiones reales con el esquema de http_logs.jsonl ("" lo desactiva)
+REQUEST_LOG_FILE = os.getenv("INGESTION_REQUEST_LOG", "out/http_requests.jsonl")
+FLUSH_EVERY = 256
+FLUSH_INTERVAL_S = 1.0
+# Segmentos con credenciales en la ruta (/basic-auth/<user>/<password>) y
+# parámetros de query cuyo valor no debe quedar en el log
+CREDENTIAL_PATH = re.compile(r"^(/(?:hidden-)?basic-auth)/[^/]+/[^/]+")
+SENSITIVE_QUERY_KEYS = {"password", "passwd", "pwd", "token", "access_token", "api_key", "apikey", "secret"}
+REDACTED = "***"
+
+_STOP = object()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class JsonlWriter:
+    """
+    Escritor JSONL en segundo plano. El hilo que hace la petición solo encola el
+    registro; un hilo dedicado agrupa las líneas y escribe en bloque.
+    """
+
+    def __init__(self, path, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL_S):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            buffer = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    buffer.append(json.dumps(item))
+                if buffer and (len(buffer) >= self.flush_every or time.monotonic() >= deadline):
+                    f.write("\n".join(buffer) + "\n")
+                    f.flush()
+                    buffer.clear()
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+            if buffer:
+                f.write("\n".join(buffer) + "\n")
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+def get_writer():
+    """Writer compartido del proceso, o None si el log está desactivado."""
+    global _writer
+    if not REQUEST_LOG_FILE:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = JsonlWriter(REQUEST_LOG_FILE)
+        return _writer
+
+
+def redact_endpoint(path, query=""):
+    """Ruta + query del log sin credenciales: /basic-auth/user/pass → /basic-auth/***/***"""
+    path = CREDENTIAL_PATH.sub(rf"\1/{REDACTED}/{REDACTED}", path)
+    if not query:
+        return path
+    params = parse_qsl(query, keep_blank_values=True)
+    if any(k.lower() in SENSITIVE_QUERY_KEYS for k, _ in params):
+        query = urlencode([(k, REDACTED if k.lower() in SENSITIVE_QUERY_KEYS else v) for k, v in params], safe="*")
+    return f"{path}?{query}"
+
+
+def log_response(response, *args, **kwargs):
+    """
+    Hook de respuesta de requests: mide la petición y encola un registro con el
+    esquema que espera 03_kpi_processing (timestamp_utc, endpoint, http_method,
+    status_code, elapsed_ms, parse_result, user_agent).
+
+    ttfb_ms es lo que requests mide hasta recibir las cabeceras (incluye la
+    conexión TCP/TLS cuando no se reutiliza una del pool; urllib3 no expone ese
+    tramo por separado). elapsed_ms añade la lectura del cuerpo salvo en
+    peticiones stream=True, donde el cuerpo lo consume el llamador.
+
+    Las respuestas servidas por la caché HTTP (HIT / REVALIDATED) se registran
+    con `cache` para que 03_kpi_processing las excluya: su latencia es la del
+    disco, no la del servicio. Las credenciales de la ruta se enmascaran.
+    """
+    writer = get_writer()
+    if writer is None:
+        return response
+
+    ttfb_ms = response.elapsed.total_seconds() * 1000
+    body_ms = 0.0
+    if not kwargs.get("stream"):
+        start = time.perf_counter()
+        response.content
+        body_ms = (time.perf_counter() - start) * 1000
+    elapsed_ms = ttfb_ms + body_ms
+
+    request = response.request
+    parts = urlsplit(request.url)
+    endpoint = redact_endpoint(parts.path, parts.query)
+    started = datetime.now(timezone.utc) - timedelta(milliseconds=elapsed_ms)
+
+    writer.write({
+        "timestamp_utc": started.isoformat(timespec="milliseconds"),
+        "endpoint": endpoint,
+        "http_method": request.method,
+        "status_code": response.status_code,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "parse_result": "ok" if 200 <= response.status_code < 300 else "error",
+        "user_agent": request.headers.get("User-Agent", ""),
+        "ttfb_ms": round(ttfb_ms, 2),
+        "cache": getattr(response, "cache_status", None),
+    })
+    return response
@@ -1,4 +1,28 @@
+import os
 from pathlib import Path
+
+# Modo streaming para los escenarios de extracción (INGESTION_STREAM=1)
+STREAM_MODE = os.getenv("INGESTION_STREAM", "0") == "1"
+CHUNK_SIZE = 64 * 1024
+
 # Asegura que un directorio exista; si no, lo crea..
 def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
+
+
+def stream_to_file(response, path: Path, on_chunk=None, chunk_size=CHUNK_SIZE):
+    """
+    Escribe el cuerpo de una respuesta (pedida con stream=True) en disco por bloques.
+    Si se indica on_chunk, recibe cada bloque para procesarlo de forma incremental.
+    Devuelve el número de bytes escritos.
+    """
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            f.write(chunk)
+            written += len(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+    return written
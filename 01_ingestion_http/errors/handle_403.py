@@ -1,6 +1,6 @@
-from common.http_session import create_session
+from common.config import BASE_URL
+from common.http_session import create_session, get_rate_limiter
 
-BASE_URL = "https://httpbin.org"
 
 def run():
     session = create_session()
@@ -8,6 +8,12 @@ def run():
 
     if response.status_code == 403:
         print("Access denied detected (403). Logging and continuing.")
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            # El limitador ya redujo la tasa del host; mostrar su estado actual
+            state = limiter.for_url(response.url).stats()
+            print(f"Rate limiter: {state['rate']} req/s, concurrency {state['concurrency']}, "
+                  f"{state['throttled']} throttled responses")
 
 if __name__ == "__main__":
     run()
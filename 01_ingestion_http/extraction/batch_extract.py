@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from common.http_session import configure_session, get_session
+
+OUTPUT_FILE = Path("outputs/batch/results.jsonl")
+
+
+def parse_rules(items):
+    """Convierte ['titulo=//slide/title'] en {'titulo': '//slide/title'}."""
+    rules = {}
+    for item in items or []:
+        name, sep, expr = item.partition("=")
+        if not sep or not name or not expr:
+            raise ValueError(f"Regla inválida '{item}': se espera nombre=expresión")
+        rules[name] = expr
+    return rules
+
+
+def read_urls(source):
+    """URLs desde un archivo o desde stdin ('-'); ignora líneas vacías y comentarios."""
+    handle = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in handle:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def detect_format(url, content_type, forced=None):
+    if forced and forced != "auto":
+        return forced
+    content_type = (content_type or "").lower()
+    if "html" in content_type:
+        return "html"
+    if "xml" in content_type:
+        return "xml"
+    return "xml" if url.lower().split("?")[0].endswith(".xml") else "html"
+
+
+def download(url):
+    """Fase de E/S (pool de hilos): descarga el cuerpo completo."""
+    response = get_session().get(url)
+    return response.status_code, response.headers.get("Content-Type", ""), response.content
+
+
+def _text(node):
+    if isinstance(node, (str, bytes)):
+        return str(node).strip()
+    return "".join(node.itertext()).strip()
+
+
+def parse_document(body, fmt, xpath_rules, css_rules):
+    """
+    Fase de CPU (pool de procesos): aplica las reglas XPath (lxml) y CSS / etiqueta
+    (BeautifulSoup + soupsieve) y devuelve {regla: [textos]}.
+    """
+    from lxml import etree, html
+
+    results = {}
+    if fmt == "xml":
+        root = etree.fromstring(body)
+        for name, expr in xpath_rules.items():
+            found = root.xpath(expr)
+            results[name] = [_text(n) for n in (found if isinstance(found, list) else [found])]
+        return results
+
+    if xpath_rules:
+        root = html.fromstring(body)
+        for name, expr in xpath_rules.items():
+            found = root.xpath(expr)
+            results[name] = [_text(n) for n in (found if isinstance(found, list) else [found])]
+    if css_rules:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(body, "lxml")
+        for name, selector in css_rules.items():
+            results[name] = [el.get_text(strip=True) for el in soup.select(selector)]
+    return results
+
+
+def run_batch(urls, xpath_rules, css_rules, output=OUTPUT_FILE, io_workers=16, parse_workers=None, fmt="auto"):
+    """
+    Descarga en el pool de E/S, parsea en el pool de procesos y escribe cada
+    resultado en JSONL en cuanto está listo. Un único límite cubre descargas y
+    parseos en curso (el doble del pool más grande): una URL ocupa su hueco
+    hasta que se escribe su resultado, así que si el parseo va más lento que
+    la red se dejan de lanzar descargas y la memoria no crece con la lista de
+    URLs, que puede ser arbitrariamente larga.
+    """
+    if fmt == "xml" and css_rules:
+        raise ValueError("Las reglas CSS solo se aplican a HTML; con formato xml usa --xpath")
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    url_iter = iter(urls)
+    max_in_flight = max(io_workers, parse_workers or os.cpu_count() or 1) * 2
+    written = errors = 0
+    started = time.perf_counter()
+
+    with open(output, "w", encoding="utf-8") as sink, \
+            ThreadPoolExecutor(max_workers=io_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers) as cpu_pool:
+        pending = {}
+        in_flight = 0
+
+        def fill():
+            nonlocal in_flight
+            while in_flight < max_in_flight:
+                url = next(url_iter, None)
+                if url is None:
+                    return
+                pending[io_pool.submit(download, url)] = ("download", {"url": url})
+                in_flight += 1
+
+        def emit(record):
+            nonlocal written, errors, in_flight
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            written += 1
+            errors += record.get("error") is not None
+            in_flight -= 1
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, record = pending.pop(future)
+                if kind == "download":
+                    try:
+                        status, content_type, body = future.result()
+                    except Exception as e:
+                        emit(dict(record, status_code=None, format=None, results={}, error=f"{type(e).__name__}: {e}"))
+                        continue
+                    record.update(status_code=status, format=detect_format(record["url"], content_type, fmt))
+                    parse = cpu_pool.submit(parse_document, body, record["format"], xpath_rules, css_rules)
+                    pending[parse] = ("parse", record)
+                else:
+                    try:
+                        emit(dict(record, results=future.result(), error=None))
+                    except Exception as e:
+                        emit(dict(record, results={}, error=f"{type(e).__name__}: {e}"))
+            fill()
+
+    elapsed = time.perf_counter() - started
+    print(f"Batch extraction: {written} URLs ({errors} errors) in {elapsed:.2f}s -> {output}")
+    return written, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción HTML/XML en bloque sobre una lista de URLs")
+    parser.add_argument("--urls", default="-", help="Archivo con una URL por línea ('-' = stdin)")
+    parser.add_argument("--xpath", action="append", help="Regla nombre=expresión XPath (XML o HTML)")
+    parser.add_argument("--css", action="append", help="Regla nombre=selector CSS o etiqueta (HTML)")
+    parser.add_argument("--format", choices=["auto", "xml", "html"], default="auto")
+    parser.add_argument("--output", default=str(OUTPUT_FILE), help=f"JSONL de salida (default: {OUTPUT_FILE})")
+    parser.add_argument("--io-workers", type=int, default=16, help="Hilos de descarga")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Procesos de parseo (default: núcleos)")
+    args = parser.parse_args()
+
+    xpath_rules, css_rules = parse_rules(args.xpath), parse_rules(args.css)
+    if not xpath_rules and not css_rules:
+        parser.error("indica al menos una regla --xpath o --css")
+    if args.format == "xml" and css_rules:
+        parser.error("--css solo se aplica a HTML; con --format xml usa --xpath")
+
+    configure_session(pool_maxsize=args.io_workers)
+    run_batch(read_urls(args.urls), xpath_rules, css_rules, args.output,
+              args.io_workers, args.parse_workers, args.format)
@@ -1,23 +1,93 @@
+import codecs
+from html.parser import HTMLParser
 from pathlib import Path
 from bs4 import BeautifulSoup
+from common.config import BASE_URL
 from common.http_session import create_session
+from common.utils import CHUNK_SIZE, STREAM_MODE
 
-BASE_URL = "https://httpbin.org"
 OUTPUT_DIR = Path("outputs/html")
+TARGET_TAG = "h1"
+# Elementos sin etiqueta de cierre: no abren un nivel de anidamiento
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
 
-def run():
+
+class FirstTagText(HTMLParser):
+    """Parser por eventos que captura el texto del primer <tag> y marca done al cerrarlo."""
+
+    def __init__(self, tag):
+        super().__init__()
+        self.tag = tag
+        self.depth = 0
+        self.parts = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done or tag in VOID_ELEMENTS:
+            return
+        if tag == self.tag or self.depth:
+            self.depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <img ... />: no tienen contenido ni cierre propio
+        pass
+
+    def handle_endtag(self, tag):
+        if self.depth and tag not in VOID_ELEMENTS:
+            self.depth -= 1
+            if self.depth == 0:
+                self.done = True
+
+    def handle_data(self, data):
+        if self.depth and not self.done:
+            self.parts.append(data)
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+def run(stream=STREAM_MODE):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     session = create_session()
 
-    response = session.get(f"{BASE_URL}/html")
-    soup = BeautifulSoup(response.text, "html.parser")
+    if stream:
+        title = extract_streaming(session)
+    else:
+        response = session.get(f"{BASE_URL}/html")
+        soup = BeautifulSoup(response.text, "html.parser")
 
-    title = soup.find("h1").text
+        title = soup.find(TARGET_TAG).text
 
     with open(OUTPUT_DIR / "title.txt", "w", encoding="utf-8") as f:
         f.write(title)
 
     print("HTML content extracted")
 
+
+def extract_streaming(session):
+    """Lee el HTML por bloques y deja de descargar en cuanto se cierra el nodo buscado."""
+    parser = FirstTagText(TARGET_TAG)
+
+    with session.get(f"{BASE_URL}/html", stream=True) as response:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+
+    # Sin el cierre del nodo el texto estaría truncado: también es un error
+    if not parser.done:
+        if parser.parts:
+            raise ValueError(f"<{TARGET_TAG}> sin cerrar: la respuesta terminó antes de </{TARGET_TAG}>")
+        raise ValueError(f"No se encontró <{TARGET_TAG}> en la respuesta")
+    return parser.text
+
 if __name__ == "__main__":
     run()
@@ -1,14 +1,22 @@
 import json
 from pathlib import Path
+from common.config import BASE_URL
 from common.http_session import create_session
+from common.utils import STREAM_MODE, stream_to_file
 
-BASE_URL = "https://httpbin.org"
 OUTPUT_DIR = Path("outputs/json")
 
-def run():
+def run(stream=STREAM_MODE):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     session = create_session()
 
+    if stream:
+        # El cuerpo va directo a disco por bloques, sin cargarlo en memoria
+        with session.get(f"{BASE_URL}/get", stream=True) as response:
+            size = stream_to_file(response, OUTPUT_DIR / "response.json")
+        print(f"JSON saved successfully (streamed {size} bytes)")
+        return
+
     response = session.get(f"{BASE_URL}/get")
 
     with open(OUTPUT_DIR / "response.json", "w", encoding="utf-8") as f:
@@ -1,14 +1,19 @@
 from pathlib import Path
 from lxml import etree
+from common.config import BASE_URL
 from common.http_session import create_session
+from common.utils import STREAM_MODE, stream_to_file
 
-BASE_URL = "https://httpbin.org"
 OUTPUT_DIR = Path("outputs/xml")
 
-def run():
+def run(stream=STREAM_MODE):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     session = create_session()
 
+    if stream:
+        run_streaming(session)
+        return
+
     response = session.get(f"{BASE_URL}/xml")
     root = etree.fromstring(response.content)
 
@@ -17,5 +22,30 @@ def run():
 
     print("XML saved successfully")
 
+
+def run_streaming(session):
+    """
+    Guarda el XML por bloques y lo valida a la vez con un parser incremental
+    (equivalente a iterparse alimentado desde la red). Cada elemento cerrado se
+    libera junto con sus hermanos ya procesados, así la memoria no crece con el tamaño.
+    """
+    parser = etree.XMLPullParser(events=("end",))
+    elements = 0
+
+    def feed(chunk):
+        nonlocal elements
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            elements += 1
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    with session.get(f"{BASE_URL}/xml", stream=True) as response:
+        size = stream_to_file(response, OUTPUT_DIR / "response.xml", on_chunk=feed)
+    parser.close()
+
+    print(f"XML saved successfully (streamed {size} bytes, {elements} elements)")
+
 if __name__ == "__main__":
     run()
@@ -1,8 +1,17 @@
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 from faker import Faker
-from common.http_session import create_session
+from common.config import BASE_URL
+from common.http_session import configure_session, create_session, get_session
 
 fake = Faker()
-BASE_URL = "https://httpbin.org"
+OUTPUT_DIR = Path("outputs/forms")
+CHUNK_PAYLOADS = 1000
 
 def run():
     session = create_session()
@@ -16,5 +25,104 @@ def run():
     response = session.post(f"{BASE_URL}/post", data=payload)
     print(response.json())
 
+
+def generate_payloads(seed, count):
+    """Genera `count` formularios con un Faker propio sembrado (apto para otro proceso)."""
+    faker = Faker()
+    faker.seed_instance(seed)
+    return [
+        {"name": faker.name(), "email": faker.email(), "message": faker.sentence()}
+        for _ in range(count)
+    ]
+
+
+def build_payload_pool(size, seed, processes=1):
+    """
+    Pool reproducible de payloads. Se genera por bloques con semillas derivadas de
+    `seed`, así el resultado es el mismo con 1 o N procesos.
+    """
+    rng = random.Random(seed)
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        count = min(CHUNK_PAYLOADS, remaining)
+        chunks.append((rng.getrandbits(32), count))
+        remaining -= count
+
+    if processes <= 1:
+        return [p for chunk_seed, count in chunks for p in generate_payloads(chunk_seed, count)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = pool.map(generate_payloads, *zip(*chunks))
+        return [p for chunk in results for p in chunk]
+
+
+def submit_one(index, payload):
+    start = time.perf_counter()
+    outcome = {"index": index, "status_code": None, "ok": False, "error": None}
+    try:
+        response = get_session().post(f"{BASE_URL}/post", data=payload)
+        outcome["status_code"] = response.status_code
+        outcome["ok"] = response.ok
+    except Exception as e:
+        outcome["error"] = f"{type(e).__name__}: {e}"
+    outcome["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return outcome
+
+
+def run_bulk(count, workers=16, pool_size=1000, seed=42, processes=1, output=None):
+    """
+    Envía `count` formularios tomando payloads del pool de forma cíclica, con como
+    mucho `workers` peticiones en vuelo. Cada resultado se guarda en JSONL.
+    """
+    output = Path(output) if output else OUTPUT_DIR / "bulk_results.jsonl"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    payloads = build_payload_pool(min(pool_size, count), seed, processes)
+    print(f"Payload pool: {len(payloads)} forms in {time.perf_counter() - started:.2f}s")
+
+    # Limita también las tareas encoladas para no crear `count` futures a la vez
+    slots = threading.BoundedSemaphore(workers * 2)
+    ok = failed = 0
+    lock = threading.Lock()
+
+    with open(output, "w", encoding="utf-8") as f, ThreadPoolExecutor(max_workers=workers) as pool:
+        def done(future):
+            nonlocal ok, failed
+            outcome = future.result()
+            with lock:
+                f.write(json.dumps(outcome) + "\n")
+                if outcome["ok"]:
+                    ok += 1
+                else:
+                    failed += 1
+            slots.release()
+
+        sending = time.perf_counter()
+        for i in range(count):
+            slots.acquire()
+            pool.submit(submit_one, i, payloads[i % len(payloads)]).add_done_callback(done)
+        pool.shutdown(wait=True)
+        elapsed = time.perf_counter() - sending
+
+    rate = count / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"Forms submitted: {ok} ok, {failed} failed in {elapsed:.2f}s ({rate:,.0f} forms/min)")
+    print(f"Outcomes saved to {output}")
+    return ok, failed
+
+
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser(description="Envío de formularios (uno, o en bloque con --bulk)")
+    parser.add_argument("--bulk", type=int, default=0, help="Número de formularios a enviar en modo bloque")
+    parser.add_argument("--workers", type=int, default=16, help="Peticiones en vuelo como máximo")
+    parser.add_argument("--pool-size", type=int, default=1000, help="Payloads distintos pre-generados")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del pool de payloads")
+    parser.add_argument("--processes", type=int, default=1, help="Procesos para generar el pool")
+    parser.add_argument("--output", help="JSONL de resultados (default: outputs/forms/bulk_results.jsonl)")
+    args = parser.parse_args()
+
+    if args.bulk:
+        configure_session(pool_maxsize=args.workers)
+        run_bulk(args.bulk, args.workers, args.pool_size, args.seed, args.processes, args.output)
+    else:
+        run()
@@ -0,0 +1,161 @@
+import argparse
+import contextlib
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MIX = "json=4,xml=2,html=2,form=1,redirect=1"
+
+
+def parse_mix(text):
+    """Convierte 'json=4,xml=2' en {'json': 4.0, 'xml': 2.0}."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, q):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    # q * n / 100 (no q / 100 * n): con q y n enteros el producto es exacto
+    index = max(math.ceil(q * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def arrival_times(rps, duration, poisson, rng):
+    """Instantes de llegada (segundos desde el inicio) del plan de carga."""
+    t = 0.0
+    while t < duration:
+        yield t
+        t += rng.expovariate(rps) if poisson else 1.0 / rps
+
+
+class LoadStats:
+    """Latencias por escenario. La latencia se mide desde el instante planificado."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.last_end = 0.0
+
+    def record(self, name, latency, ok, end):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(latency)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            self.last_end = max(self.last_end, end)
+
+
+def execute(stats, name, func, intended):
+    ok = True
+    try:
+        func()
+    except Exception:
+        ok = False
+    end = time.perf_counter()
+    stats.record(name, end - intended, ok, end)
+
+
+def print_report(stats, started, scheduled, duration):
+    completed = sum(len(v) for v in stats.latencies.values())
+    wall = max(stats.last_end - started, duration)
+    print(f"\nScheduled: {scheduled} requests over {duration:.1f}s ({scheduled / duration:.1f} req/s)")
+    print(f"Completed: {completed} in {wall:.2f}s -> achieved {completed / wall:.1f} req/s\n")
+
+    header = f"  {'scenario':<10} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    rows = sorted(stats.latencies.items())
+    everything = sorted(v for _, values in rows for v in values)
+    for name, values in rows + [("all", everything)]:
+        values = sorted(values)
+        errors = sum(stats.errors.values()) if name == "all" else stats.errors.get(name, 0)
+        print(
+            f"  {name:<10} {len(values):>7} {errors:>7} "
+            f"{percentile(values, 50) * 1000:>9.1f} {percentile(values, 90) * 1000:>9.1f} "
+            f"{percentile(values, 99) * 1000:>9.1f} {(values[-1] if values else 0) * 1000:>9.1f}"
+        )
+
+
+def main(workers, rps, duration, mix, poisson, seed, use_cache, use_rate_limit, verbose):
+    # Importación diferida: los escenarios leen INGESTION_BASE_URL al importarse
+    from common.http_session import configure_session, get_rate_limiter
+    from run_all import SCENARIOS
+
+    available = dict(SCENARIOS)
+    unknown = set(mix) - set(available)
+    if unknown:
+        raise ValueError(f"Escenarios desconocidos en --mix: {sorted(unknown)}. Disponibles: {sorted(available)}")
+
+    overrides = {"pool_maxsize": workers}
+    if not use_cache:
+        overrides["cache_dir"] = None
+    if not use_rate_limit:
+        overrides["rate_limit"] = False
+    configure_session(**overrides)
+
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    stats = LoadStats()
+    scheduled = 0
+
+    print(f"Load test: {rps} req/s for {duration}s with {workers} workers, mix {mix}")
+    # Lazo abierto: cada petición sale en su instante planificado aunque las
+    # anteriores no hayan terminado, así la cola cuenta en la latencia
+    # (evita la omisión coordinada de un cliente en lazo cerrado).
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        pool = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+        started = time.perf_counter()
+        for offset in arrival_times(rps, duration, poisson, rng):
+            intended = started + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            pool.submit(execute, stats, name, available[name], intended)
+            scheduled += 1
+
+    print_report(stats, started, scheduled, duration)
+
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        for host, state in limiter.stats().items():
+            print(f"\nRate limiter {host}: {state['rate']} req/s, concurrency {state['concurrency']}, "
+                  f"{state['throttled']} throttled, {state['waits']} waited")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de carga sobre los escenarios de ingestión")
+    parser.add_argument("--workers", type=int, default=8, help="Hilos que ejecutan peticiones")
+    parser.add_argument("--rps", type=float, default=10.0, help="Peticiones por segundo objetivo")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duración de la prueba en segundos")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Pesos por escenario (default: {DEFAULT_MIX})")
+    parser.add_argument("--base-url", help="Sobrescribe INGESTION_BASE_URL (p. ej. un servidor local)")
+    parser.add_argument("--local", action="store_true", help="Arranca el servidor local en segundo plano y lo usa como destino")
+    parser.add_argument("--poisson", action="store_true", help="Llegadas de Poisson en vez de equiespaciadas")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del plan de llegadas y del mix")
+    parser.add_argument("--no-cache", action="store_true", help="Desactiva la caché HTTP en disco")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Desactiva el limitador adaptativo por host")
+    parser.add_argument("--verbose", action="store_true", help="Muestra la salida de cada escenario")
+    args = parser.parse_args()
+
+    if args.local:
+        from local_server.server import start_in_background
+        _, url = start_in_background(port=0)
+        os.environ["INGESTION_TARGET"] = "local"
+        os.environ["INGESTION_LOCAL_URL"] = url
+    elif args.base_url:
+        os.environ["INGESTION_TARGET"] = "remote"
+        os.environ["INGESTION_BASE_URL"] = args.base_url
+
+    main(args.workers, args.rps, args.duration, parse_mix(args.mix), args.poisson,
+         args.seed, not args.no_cache, not args.no_rate_limit, args.verbose)
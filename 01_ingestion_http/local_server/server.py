@@ -0,0 +1,225 @@
+import argparse
+import base64
+import email.utils
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+XML_TEMPLATE = """<?xml version='1.0' encoding='us-ascii'?>
+<slideshow title="Sample Slide Show" date="Date of publication" author="Yours Truly">
+{slides}</slideshow>
+"""
+XML_SLIDE = """  <slide type="all">
+    <title>Slide {n}</title>
+    <item>Why <em>WonderWidgets</em> are great</item>
+  </slide>
+"""
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head>
+  </head>
+  <body>
+      <h1>Herman Melville - Moby-Dick</h1>
+{paragraphs}  </body>
+</html>"""
+HTML_PARAGRAPH = "      <p>Availing himself of the mild, summer-cool weather that now reigned in these latitudes.</p>\n"
+
+
+class ServerOptions:
+    """Latencia, tamaño de payload y tasa de errores inyectados por el servidor."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, payload_kb=0.0, error_rate=0.0, max_age=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.payload_kb = payload_kb
+        self.error_rate = error_rate
+        self.max_age = max_age
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.started = time.time()
+        self.xml = self._repeat(XML_TEMPLATE, "slides", XML_SLIDE).encode("ascii")
+        self.html = self._repeat(HTML_TEMPLATE, "paragraphs", HTML_PARAGRAPH).encode("utf-8")
+
+    def _repeat(self, template, field, block):
+        # Al menos dos bloques, como el documento original de httpbin
+        target = int(self.payload_kb * 1024)
+        count = max(2, target // len(block.format(n=0)) + 1) if target else 2
+        body = "".join(block.format(n=n) for n in range(1, count + 1))
+        return template.format(**{field: body})
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            jitter = (self.random() * 2 - 1) * self.jitter_ms
+            time.sleep(max(self.latency_ms + jitter, 0) / 1000)
+
+    def padding(self):
+        return "x" * int(self.payload_kb * 1024)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Implementa los endpoints de httpbin que usan los escenarios de ingestión."""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo salen en escrituras separadas; sin TCP_NODELAY el ACK
+    # retardado añade ~40 ms a cada respuesta keep-alive
+    disable_nagle_algorithm = True
+    server_version = "local-httpbin/1.0"
+    options = ServerOptions()
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---------------- utilidades ----------------
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status, data, headers=None):
+        self._send(status, json.dumps(data, indent=2).encode("utf-8") + b"\n", headers=headers)
+
+    def _send_static(self, body, content_type):
+        """Documento estático con ETag / Last-Modified y respuesta 304 condicional."""
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": email.utils.formatdate(self.options.started, usegmt=True),
+            "Cache-Control": f"max-age={self.options.max_age}",
+        }
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers=headers)
+        else:
+            self._send(200, body, content_type, headers)
+
+    def _redirect(self, location, status=302):
+        self._send(status, b"", "text/html; charset=utf-8", {"Location": location})
+
+    def _echo(self, parts, form=None):
+        return {
+            "args": dict(parse_qsl(parts.query)),
+            "form": form or {},
+            "headers": dict(self.headers.items()),
+            "origin": self.client_address[0],
+            "url": f"http://{self.headers.get('Host', '')}{self.path}",
+        }
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    # ---------------- despacho ----------------
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        body = self._read_body()
+
+        self.options.delay()
+        if segments[:1] != ["status"] and self.options.random() < self.options.error_rate:
+            self._send_json(503, {"error": "injected failure"}, {"Retry-After": "1"})
+            return
+
+        if segments == ["get"] and self.command == "GET":
+            data = self._echo(parts)
+            if self.options.payload_kb:
+                data["padding"] = self.options.padding()
+            self._send_json(200, data)
+        elif segments == ["post"] and self.command == "POST":
+            form = dict(parse_qsl(body.decode("utf-8", errors="replace")))
+            self._send_json(200, self._echo(parts, form))
+        elif segments == ["xml"]:
+            self._send_static(self.options.xml, "application/xml")
+        elif segments == ["html"]:
+            self._send_static(self.options.html, "text/html; charset=utf-8")
+        elif segments == ["cookies"]:
+            cookies = {}
+            for item in (self.headers.get("Cookie") or "").split(";"):
+                name, _, value = item.strip().partition("=")
+                if name:
+                    cookies[name] = value
+            self._send_json(200, {"cookies": cookies})
+        elif segments == ["cookies", "set"]:
+            self.send_response(302)
+            for name, value in parse_qsl(parts.query):
+                self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+            self.send_header("Location", "/cookies")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif len(segments) == 3 and segments[0] == "basic-auth":
+            user, password = segments[1], segments[2]
+            expected = "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+            if self.headers.get("Authorization") == expected:
+                self._send_json(200, {"authenticated": True, "user": user})
+            else:
+                self._send(401, headers={"WWW-Authenticate": 'Basic realm="Fake Realm"'})
+        elif len(segments) == 2 and segments[0] == "status" and segments[1].isdigit():
+            code = int(segments[1])
+            if 300 <= code < 400:
+                self._redirect("/get", code)
+            else:
+                self._send(code, content_type="text/html; charset=utf-8")
+        elif segments == ["redirect-to"]:
+            args = dict(parse_qsl(parts.query))
+            self._redirect(args.get("url", "/get"), int(args.get("status_code", 302)))
+        else:
+            self._send_json(404, {"error": f"endpoint no soportado: {parts.path}"})
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = _dispatch
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Crea el servidor con un handler propio para no compartir opciones entre instancias."""
+    handler = type("ConfiguredHandler", (StandInHandler,), {"options": ServerOptions(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Arranca el servidor en un hilo daemon y devuelve (server, base_url)."""
+    server = make_server(host, port, **options)
+    thread = threading.Thread(target=server.serve_forever, name="local-httpbin", daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita los endpoints de httpbin usados por la ingestión")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia inyectada por petición")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variación aleatoria (+/-) de la latencia")
+    parser.add_argument("--payload-kb", type=float, default=0.0, help="Tamaño aproximado de /get, /xml y /html")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de peticiones que responden 503")
+    parser.add_argument("--max-age", type=int, default=0, help="Cache-Control max-age de /xml y /html")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla de latencias y errores")
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, payload_kb=args.payload_kb,
+        error_rate=args.error_rate, max_age=args.max_age, seed=args.seed,
+    )
+    print(f"Servidor local escuchando en http://{args.host}:{args.port} (Ctrl+C para detener)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
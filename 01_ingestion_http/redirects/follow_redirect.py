@@ -1,6 +1,6 @@
+from common.config import BASE_URL
 from common.http_session import create_session
 
-BASE_URL = "https://httpbin.org"
 
 def run():
     session = create_session()
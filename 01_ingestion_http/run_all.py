@@ -1,3 +1,9 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common.http_session import POOL_MAXSIZE, configure_session, get_cache, get_rate_limiter
+
 from auth.basic_auth import run as auth_run
 from cookies.cookies_session import run as cookies_run
 from extraction.get_json import run as json_run
@@ -7,19 +13,103 @@ from forms.post_form import run as form_run
 from errors.handle_403 import run as error_run
 from redirects.follow_redirect import run as redirect_run
 
-def main():
+# Cada escenario es una tarea independiente. Los pasos que dependen de un orden
+# (p. ej. set + read de cookies) ya viven dentro del mismo run().
+SCENARIOS = [
+    ("auth", auth_run),
+    ("cookies", cookies_run),
+    ("json", json_run),
+    ("xml", xml_run),
+    ("html", html_run),
+    ("form", form_run),
+    ("error_403", error_run),
+    ("redirect", redirect_run),
+]
+
+
+def run_scenario(name, func):
+    """Ejecuta un escenario y devuelve (nombre, segundos, error)."""
+    start = time.perf_counter()
+    error = None
+    try:
+        func()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return name, time.perf_counter() - start, error
+
+
+def print_timings(results, total):
+    print("\nScenario timings:")
+    print(f"  {'scenario':<12} {'seconds':>9}  status")
+    for name, elapsed, error in results:
+        status = "ok" if error is None else f"FAILED ({error.split(':')[0]})"
+        print(f"  {name:<12} {elapsed:>9.3f}  {status}")
+
+    serial = sum(elapsed for _, elapsed, _ in results)
+    print(f"  {'total':<12} {total:>9.3f}")
+    if total > 0:
+        print(f"  sum of scenarios: {serial:.3f}s (speedup x{serial / total:.2f})")
+
+
+def print_cache_stats():
+    cache = get_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    print(
+        f"\nHTTP cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['revalidated']} revalidated (304), {stats['evicted']} evicted "
+        f"({stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB)"
+    )
+
+
+def print_rate_limit_stats():
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+    for host, stats in limiter.stats().items():
+        print(
+            f"Rate limiter {host}: {stats['rate']} req/s, concurrency {stats['concurrency']}, "
+            f"{stats['requests']} requests, {stats['throttled']} throttled, {stats['waits']} waited"
+        )
+
+
+def main(workers=1):
     print("Running HTTP ingestion scenarios...\n")
 
-    auth_run()
-    cookies_run()
-    json_run()
-    xml_run()
-    html_run()
-    form_run()
-    error_run()
-    redirect_run()
+    # Un slot del pool keep-alive por hilo para no descartar conexiones
+    configure_session(pool_maxsize=max(workers, POOL_MAXSIZE))
+
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [run_scenario(name, func) for name, func in SCENARIOS]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_scenario, name, func) for name, func in SCENARIOS]
+            results = [f.result() for f in futures]
+    total = time.perf_counter() - start
+
+    print_timings(results, total)
+    print_cache_stats()
+    print_rate_limit_stats()
+
+    failed = [(name, error) for name, _, error in results if error is not None]
+    if failed:
+        print("\nScenarios with errors:")
+        for name, error in failed:
+            print(f"  {name}: {error}")
+    else:
+        print("\nAll scenarios executed successfully")
 
-    print("\nAll scenarios executed successfully")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ejecuta los escenarios de ingestión HTTP")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Escenarios ejecutados en paralelo (1 = modo serie)"
+    )
+    args = parser.parse_args()
+
+    main(args.workers)
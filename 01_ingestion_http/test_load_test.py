@@ -0,0 +1,28 @@
+import unittest
+
+from load_test import percentile
+
+
+class PercentileTest(unittest.TestCase):
+    """Rango más cercano: el menor valor con al menos q% de la muestra por debajo o igual."""
+
+    def test_known_values(self):
+        one_to_ten = list(range(1, 11))
+        one_to_hundred = list(range(1, 101))
+        self.assertEqual(percentile(one_to_ten, 50), 5)
+        self.assertEqual(percentile(one_to_ten, 90), 9)
+        self.assertEqual(percentile(one_to_ten, 100), 10)
+        self.assertEqual(percentile(one_to_hundred, 7), 7)
+        self.assertEqual(percentile(one_to_hundred, 99), 99)
+        self.assertEqual(percentile(one_to_hundred, 99.5), 100)
+
+    def test_small_samples(self):
+        self.assertEqual(percentile([], 99), 0.0)
+        self.assertEqual(percentile([3.5], 50), 3.5)
+        self.assertEqual(percentile([1, 2], 0), 1)
+        self.assertEqual(percentile([1, 2], 50), 1)
+        self.assertEqual(percentile([1, 2], 51), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
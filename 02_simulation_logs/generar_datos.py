@@ -1,9 +1,18 @@
 import json
 import random
 import argparse
+import hashlib
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from faker import Faker
-from datetime import timezone
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from logformat import columnar
+from logformat.compresion import compression_for, open_output
 
 # -----------------------------
 # Configuración por defecto
@@ -32,6 +41,12 @@ STATUS_DISTRIBUTION = [
 OUTPUT_DIR = Path("out")
 OUTPUT_FILE = OUTPUT_DIR / "http_logs.jsonl"
 
+# Modo vectorizado
+BLOCK_SIZE = 100_000
+USER_AGENT_POOL_SIZE = 1000
+
+PARSE_RESULTS = ["ok", "error"]
+
 # -----------------------------
 # Funciones auxiliares
 # -----------------------------
@@ -61,21 +76,257 @@ def generate_log(fake):
     }
 
 # -----------------------------
-# Ejecución principal
+# Generación vectorizada (NumPy)
 # -----------------------------
-def main(rows, seed):
+def month_window(month=None):
+    """
+    Rango [inicio, fin) en segundos epoch UTC. Sin `month` replica
+    date_time_this_month (inicio del mes actual hasta ahora); con "YYYY-MM"
+    usa el mes completo, lo que hace la salida idéntica entre ejecuciones.
+    """
+    if month:
+        start = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+        end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    else:
+        end = datetime.now(timezone.utc)
+        start = end.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return int(start.timestamp()), max(int(end.timestamp()), int(start.timestamp()) + 1)
+
+
+def build_user_agent_pool(seed, size=USER_AGENT_POOL_SIZE):
+    """User agents pre-generados con Faker (ya serializados como JSON)."""
     fake = Faker()
-    Faker.seed(seed)
-    random.seed(seed)
+    fake.seed_instance(seed)
+    return [json.dumps(fake.user_agent()) for _ in range(size)]
+
+
+class VectorizedGenerator:
+    """
+    Genera bloques de logs con arrays de NumPy y los serializa de una vez.
+    La salida es reproducible para la misma semilla, filas y tamaño de bloque.
+    """
+
+    def __init__(self, seed, window, user_agents):
+        self.rng = np.random.default_rng(seed)
+        self.window = window
+        self.user_agents = user_agents
+        self.endpoints = [json.dumps(e) for e in ENDPOINTS]
+        self.methods = [json.dumps(m) for m in HTTP_METHODS]
+        self.status_codes = np.array([s for s, _ in STATUS_DISTRIBUTION])
+        self.status_cumulative = np.cumsum([w for _, w in STATUS_DISTRIBUTION])
+
+    def columns(self, n):
+        rng = self.rng
+        # Mismo criterio que weighted_status(): primer acumulado >= r
+        status_idx = np.searchsorted(self.status_cumulative, rng.random(n), side="left")
+        status_idx = np.minimum(status_idx, len(self.status_codes) - 1)
+        return {
+            "timestamp": rng.integers(self.window[0], self.window[1], size=n, dtype=np.int64),
+            "endpoint": rng.integers(0, len(self.endpoints), size=n),
+            "http_method": rng.integers(0, len(self.methods), size=n),
+            "status_code": self.status_codes[status_idx],
+            "elapsed_ms": np.round(rng.uniform(50, 1500, size=n), 2),
+            "user_agent": rng.integers(0, len(self.user_agents), size=n),
+        }
+
+    def serialize(self, cols):
+        timestamps = np.datetime_as_string(cols["timestamp"].astype("datetime64[s]"))
+        endpoints, methods, agents = self.endpoints, self.methods, self.user_agents
+        return "".join([
+            f'{{"timestamp_utc": "{t}+00:00", "endpoint": {endpoints[e]}, "http_method": {methods[m]}, '
+            f'"status_code": {s}, "elapsed_ms": {ms}, "parse_result": "{"ok" if s == 200 else "error"}", '
+            f'"user_agent": {agents[u]}}}\n'
+            for t, e, m, s, ms, u in zip(
+                timestamps.tolist(), cols["endpoint"].tolist(), cols["http_method"].tolist(),
+                cols["status_code"].tolist(), cols["elapsed_ms"].tolist(), cols["user_agent"].tolist(),
+            )
+        ])
+
+    def write(self, f, rows, block_size=BLOCK_SIZE, digest=None):
+        """Escribe `rows` filas en un archivo binario; devuelve los bytes escritos."""
+        written = 0
+        for start in range(0, rows, block_size):
+            data = self.serialize(self.columns(min(block_size, rows - start))).encode("utf-8")
+            f.write(data)
+            written += len(data)
+            if digest is not None:
+                digest.update(data)
+        return written
+
+
+def write_columnar(generator, path, rows, block_size=BLOCK_SIZE):
+    """
+    Escribe `rows` filas en un directorio .cols: un array binario por columna y
+    meta.json con los diccionarios. Los códigos que produce el generador ya son
+    índices de ENDPOINTS / HTTP_METHODS / pool de user agents, no hay que
+    serializar ni parsear strings.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    # El pool puede repetir user agents; el diccionario debe tener valores únicos
+    agent_remap, agents = pd.factorize(pd.Series([json.loads(u) for u in generator.user_agents]))
+    files = {name: open(path / f"{name}.bin", "wb") for name in columnar.SCHEMA}
+    try:
+        for start in range(0, rows, block_size):
+            cols = generator.columns(min(block_size, rows - start))
+            cols["timestamp_utc"] = cols.pop("timestamp") * 1000
+            cols["parse_result"] = cols["status_code"] != 200
+            cols["user_agent"] = agent_remap[cols["user_agent"]]
+            for name, (dtype, _) in columnar.SCHEMA.items():
+                cols[name].astype(dtype).tofile(files[name])
+    finally:
+        for f in files.values():
+            f.close()
+
+    dictionaries = {
+        "endpoint": ENDPOINTS,
+        "http_method": HTTP_METHODS,
+        "parse_result": PARSE_RESULTS,
+        "user_agent": agents.tolist(),
+    }
+    columns = {}
+    for name, (dtype, encoding) in columnar.SCHEMA.items():
+        columns[name] = {"dtype": dtype, "encoding": encoding}
+        if encoding == "dictionary":
+            columns[name]["values"] = dictionaries[name]
+    meta = {"format": columnar.FORMAT_NAME, "version": columnar.FORMAT_VERSION, "rows": rows, "columns": columns}
+    (path / columnar.META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+# -----------------------------
+# Generación por shards (multi-proceso)
+# -----------------------------
+def split_name(output):
+    """("http_logs", ".jsonl.gz"): nombre base y extensiones completas."""
+    base = output.name.split(".", 1)[0]
+    return base, output.name[len(base):]
+
+
+def shard_path(output, index):
+    base, suffixes = split_name(output)
+    return output.with_name(f"{base}.part-{index:05d}{suffixes}")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generate_shard(index, seed_seq, rows, path, window, user_agents, block_size):
+    """
+    Escribe un shard en su propio proceso y devuelve su entrada del manifiesto.
+    Cada shard comprimido es un miembro/frame completo, así que la compresión
+    también se reparte entre procesos. `bytes` y `sha256` son los del archivo
+    en disco; `raw_bytes` el tamaño sin comprimir.
+    """
+    generator = VectorizedGenerator(seed_seq, window, user_agents)
+    compressed = compression_for(path) is not None
+    digest = None if compressed else hashlib.sha256()
+    with open_output(path) as f:
+        raw_size = generator.write(f, rows, block_size, digest)
+    return {
+        "index": index,
+        "file": path.name,
+        "rows": rows,
+        "bytes": path.stat().st_size,
+        "raw_bytes": raw_size,
+        "sha256": file_digest(path) if compressed else digest.hexdigest(),
+        "spawn_key": list(seed_seq.spawn_key),
+    }
+
+
+def generate_sharded(rows, seed, shards, workers, block_size=BLOCK_SIZE, month=None, concat=False,
+                     output=OUTPUT_FILE):
+    """
+    Reparte `rows` en `shards` archivos generados en paralelo. Cada shard usa una
+    semilla hija de SeedSequence(seed), independiente y reproducible, así que el
+    resultado no depende de `workers`. Con `concat` los shards se unen byte a byte
+    en `output` (con compresión queda un archivo multi-miembro válido). Escribe
+    un manifiesto con filas y sha256 por shard.
+    """
+    window = month_window(month)
+    user_agents = build_user_agent_pool(seed)
+    children = np.random.SeedSequence(seed).spawn(shards)
+    counts = [rows // shards + (1 if i < rows % shards else 0) for i in range(shards)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_shard, i, children[i], counts[i], shard_path(output, i),
+                        window, user_agents, block_size)
+            for i in range(shards)
+        ]
+        entries = [f.result() for f in futures]
+
+    manifest = {"seed": seed, "rows": rows, "compression": compression_for(output),
+                "shards": entries, "window_utc": list(window)}
+    if concat:
+        digest = hashlib.sha256()
+        with open(output, "wb") as out:
+            for entry in entries:
+                part = output.with_name(entry["file"])
+                with open(part, "rb") as src:
+                    while chunk := src.read(1 << 20):
+                        digest.update(chunk)
+                        out.write(chunk)
+                part.unlink()
+        manifest["output"] = {"file": output.name, "bytes": sum(e["bytes"] for e in entries),
+                              "sha256": digest.hexdigest()}
+
+    manifest_path = output.with_name(f"{split_name(output)[0]}.manifest.json")
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+# -----------------------------
+# Ejecución principal
+# -----------------------------
+def stream(seed, eps, speed, duration=None, output=None):
+    """Modo streaming: eventos ordenados por tiempo hacia stdout o un archivo que crece."""
+    from trafico_stream import run_stream
+
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+    emitted = run_stream(eps, seed, build_user_agent_pool(seed), output, speed, duration=duration)
+    # Con salida a stdout el resumen va a stderr para no mezclarse con los eventos
+    log = sys.stderr if not output else sys.stdout
+    print(f"✔ {emitted} eventos emitidos en streaming ({output or 'stdout'})", file=log)
+    print(f"✔ Seed utilizada: {seed}", file=log)
+
+
+def main(rows, seed, vectorized=False, block_size=BLOCK_SIZE, month=None,
+         shards=1, workers=1, concat=False, output=OUTPUT_FILE):
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if shards > 1:
+        manifest = generate_sharded(rows, seed, shards, workers, block_size, month, concat, output)
+        base, suffixes = split_name(output)
+        target = output if concat else output.with_name(f"{base}.part-*{suffixes}")
+        print(f"✔ {rows} logs generados en {shards} shards ({target})")
+        print(f"✔ Manifiesto: {manifest}")
+        print(f"✔ Seed utilizada: {seed}")
+        return
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    if output.suffix == ".cols":
+        generator = VectorizedGenerator(seed, month_window(month), build_user_agent_pool(seed))
+        write_columnar(generator, output, rows, block_size)
+    elif vectorized:
+        generator = VectorizedGenerator(seed, month_window(month), build_user_agent_pool(seed))
+        with open_output(output, threads=-1) as f:
+            generator.write(f, rows, block_size)
+    else:
+        fake = Faker()
+        Faker.seed(seed)
+        random.seed(seed)
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        for _ in range(rows):
-            log = generate_log(fake)
-            f.write(json.dumps(log) + "\n")
+        with io.TextIOWrapper(open_output(output), encoding="utf-8") as f:
+            for _ in range(rows):
+                log = generate_log(fake)
+                f.write(json.dumps(log) + "\n")
 
-    print(f"✔ {rows} logs generados en {OUTPUT_FILE}")
+    print(f"✔ {rows} logs generados en {output}")
     print(f"✔ Seed utilizada: {seed}")
 
 # -----------------------------
@@ -100,6 +351,91 @@ if __name__ == "__main__":
         help="Semilla para reproducibilidad"
     )
 
+    parser.add_argument(
+        "--output",
+        default=str(OUTPUT_FILE),
+        help="Archivo de salida; .gz, .bz2, .xz o .zst lo comprimen y un directorio .cols usa el "
+             "formato columnar vectorizado (default: out/http_logs.jsonl)"
+    )
+
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Genera por bloques con NumPy (recomendado para millones de filas)"
+    )
+
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=BLOCK_SIZE,
+        help="Filas por bloque en modo vectorizado"
+    )
+
+    parser.add_argument(
+        "--month",
+        help="Mes YYYY-MM de los timestamps en modo vectorizado (default: mes actual hasta ahora)"
+    )
+
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Número de shards (>1 activa la generación multi-proceso vectorizada)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Procesos para generar los shards (default: núcleos disponibles)"
+    )
+
+    parser.add_argument(
+        "--concat",
+        action="store_true",
+        help="Une los shards byte a byte en un único archivo"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Emite eventos ordenados por tiempo con curvas diarias/semanales y ráfagas (indefinido sin --duration)"
+    )
+
+    parser.add_argument(
+        "--eps",
+        type=float,
+        default=50.0,
+        help="Eventos por segundo simulado (media) en modo streaming"
+    )
+
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Factor de aceleración del streaming (1 = tiempo real, 0 = sin pausas)"
+    )
+
+    parser.add_argument(
+        "--duration",
+        type=int,
+        default=None,
+        help="Segundos simulados a emitir en modo streaming (default: indefinido)"
+    )
+
+    parser.add_argument(
+        "--stream-output",
+        help="Archivo al que se añaden los eventos en modo streaming (default: stdout)"
+    )
+
     args = parser.parse_args()
 
-    main(args.rows, args.seed)
+    if args.shards > 1 and Path(args.output).suffix == ".cols":
+        parser.error("la salida columnar .cols no admite --shards")
+
+    if args.stream:
+        stream(args.seed, args.eps, args.speed, args.duration, args.stream_output)
+        sys.exit(0)
+
+    main(args.rows, args.seed, args.vectorized, args.block_size, args.month,
+         args.shards, args.workers, args.concat, args.output)
@@ -0,0 +1,150 @@
+"""
+Generador de tráfico en streaming, ordenado por timestamp.
+
+Emite eventos con el mismo esquema JSONL que generar_datos.py pero siguiendo una
+forma de carga realista: curva diaria y semanal, ráfagas aleatorias y regímenes
+de latencia por endpoint (normal / degradado con cola pesada). El tiempo simulado
+avanza segundo a segundo; con `speed` se acelera respecto al reloj real.
+"""
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from generar_datos import HTTP_METHODS, STATUS_DISTRIBUTION
+
+# Latencia base por endpoint: (mediana ms, sigma lognormal)
+ENDPOINT_LATENCY = {
+    "/get": (180.0, 0.45),
+    "/post": (320.0, 0.50),
+    "/xml": (260.0, 0.45),
+    "/html": (240.0, 0.45),
+    "/status/403": (90.0, 0.35),
+    "/redirect": (210.0, 0.50),
+}
+ENDPOINT_WEIGHTS = [0.30, 0.15, 0.15, 0.15, 0.10, 0.15]
+
+# Forma de la carga
+PEAK_HOUR_UTC = 15            # máximo de la curva diaria
+DAILY_AMPLITUDE = 0.6         # 0 = plana, 1 = cae a cero en el valle
+WEEKEND_FACTOR = 0.55         # sábado y domingo
+BURST_PROBABILITY = 1 / 1800  # probabilidad de que empiece una ráfaga cada segundo
+BURST_FACTOR = (3.0, 8.0)     # multiplicador de tasa durante la ráfaga
+BURST_SECONDS = (20, 120)
+DEGRADED_PROBABILITY = 1 / 3600  # probabilidad por endpoint y segundo de entrar en régimen degradado
+DEGRADED_SECONDS = (60, 600)
+DEGRADED_LATENCY = (4.0, 1.0)    # multiplicador de mediana y sigma extra en régimen degradado
+DEGRADED_5XX = 0.35              # proporción de 5xx durante la degradación
+
+
+def load_shape(ts):
+    """Factor de carga (media ~1) para un instante epoch: curva diaria x semanal."""
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    hour = dt.hour + dt.minute / 60
+    daily = 1 + DAILY_AMPLITUDE * math.cos(2 * math.pi * (hour - PEAK_HOUR_UTC) / 24)
+    weekly = WEEKEND_FACTOR if dt.weekday() >= 5 else 1.0
+    return daily * weekly
+
+
+class TrafficStream:
+    """Genera segundo a segundo los eventos de tráfico en orden temporal."""
+
+    def __init__(self, eps, seed, start_ts, user_agents):
+        self.eps = eps
+        self.rng = np.random.default_rng(seed)
+        self.now = int(start_ts)
+        self.user_agents = user_agents
+        self.endpoints = list(ENDPOINT_LATENCY)
+        self.endpoint_json = [json.dumps(e) for e in self.endpoints]
+        self.method_json = [json.dumps(m) for m in HTTP_METHODS]
+        self.medians = np.log([ENDPOINT_LATENCY[e][0] for e in self.endpoints])
+        self.sigmas = np.array([ENDPOINT_LATENCY[e][1] for e in self.endpoints])
+        self.status_codes = np.array([s for s, _ in STATUS_DISTRIBUTION])
+        self.status_cumulative = np.cumsum([w for _, w in STATUS_DISTRIBUTION])
+        self.burst_until = 0
+        self.burst_factor = 1.0
+        self.degraded_until = np.zeros(len(self.endpoints), dtype=np.int64)
+
+    def _update_regimes(self):
+        rng = self.rng
+        if self.now >= self.burst_until and rng.random() < BURST_PROBABILITY:
+            self.burst_until = self.now + int(rng.integers(*BURST_SECONDS))
+            self.burst_factor = float(rng.uniform(*BURST_FACTOR))
+        starting = (self.degraded_until <= self.now) & (rng.random(len(self.endpoints)) < DEGRADED_PROBABILITY)
+        if starting.any():
+            self.degraded_until[starting] = self.now + rng.integers(*DEGRADED_SECONDS, size=int(starting.sum()))
+
+    def next_second(self):
+        """Eventos (ya serializados) del siguiente segundo simulado, ordenados."""
+        rng = self.rng
+        self._update_regimes()
+        rate = self.eps * load_shape(self.now)
+        if self.now < self.burst_until:
+            rate *= self.burst_factor
+        n = int(rng.poisson(rate))
+        second = self.now
+        self.now += 1
+        if n == 0:
+            return []
+
+        offsets = np.sort(rng.integers(0, 1000, size=n))
+        endpoint = rng.choice(len(self.endpoints), size=n, p=ENDPOINT_WEIGHTS)
+        degraded = self.degraded_until[endpoint] > second
+
+        status_idx = np.minimum(
+            np.searchsorted(self.status_cumulative, rng.random(n), side="left"), len(self.status_codes) - 1
+        )
+        status = self.status_codes[status_idx]
+        status = np.where(degraded & (rng.random(n) < DEGRADED_5XX), 500, status)
+
+        mu = self.medians[endpoint] + np.where(degraded, math.log(DEGRADED_LATENCY[0]), 0.0)
+        sigma = self.sigmas[endpoint] + np.where(degraded, DEGRADED_LATENCY[1], 0.0)
+        elapsed = np.round(rng.lognormal(mu, sigma), 2)
+        method = rng.integers(0, len(HTTP_METHODS), size=n)
+        agent = rng.integers(0, len(self.user_agents), size=n)
+
+        stamp = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        endpoints, methods, agents = self.endpoint_json, self.method_json, self.user_agents
+        return [
+            f'{{"timestamp_utc": "{stamp}.{ms:03d}+00:00", "endpoint": {endpoints[e]}, '
+            f'"http_method": {methods[m]}, "status_code": {s}, "elapsed_ms": {v}, '
+            f'"parse_result": "{"ok" if s == 200 else "error"}", "user_agent": {agents[u]}}}\n'
+            for ms, e, m, s, v, u in zip(
+                offsets.tolist(), endpoint.tolist(), method.tolist(),
+                status.tolist(), elapsed.tolist(), agent.tolist(),
+            )
+        ]
+
+
+def run_stream(eps, seed, user_agents, output=None, speed=1.0, start_ts=None, duration=None):
+    """
+    Escribe eventos en orden temporal en `output` (archivo que crece) o stdout.
+    speed=1 va a tiempo real, speed=60 simula un minuto por segundo real y
+    speed=0 genera tan rápido como sea posible. Sin `duration` (segundos
+    simulados) corre indefinidamente.
+    """
+    start_ts = int(start_ts if start_ts is not None else time.time())
+    stream = TrafficStream(eps, seed, start_ts, user_agents)
+    handle = open(output, "a", encoding="utf-8") if output else sys.stdout
+    wall_start = time.monotonic()
+    emitted = 0
+    try:
+        while duration is None or stream.now - start_ts < duration:
+            lines = stream.next_second()
+            if lines:
+                handle.write("".join(lines))
+                emitted += len(lines)
+            if speed > 0:
+                handle.flush()
+                delay = (stream.now - start_ts) / speed - (time.monotonic() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    return emitted
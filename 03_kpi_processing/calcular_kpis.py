@@ -1,15 +1,36 @@
 import json
 import argparse
-import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
-import numpy as np
+from logformat.compresion import JsonlReader, compression_for
+from logformat.columnar import is_columnar, load_columnar
+from endpoints import EndpointNormalizer
+import incremental
+import latency_sketch
+import raw_store
 
 
 DEFAULT_INPUT = Path("02_simulation_logs/out/http_logs.jsonl")
 OUT_DIR = Path("out")
 OUT_CSV = OUT_DIR / "kpi_por_endpoint_dia.csv"
 
+REQUIRED_COLUMNS = {"timestamp_utc", "endpoint", "status_code", "elapsed_ms"}
+GROUP_KEYS = ["date_utc", "endpoint_base"]
+MINUTE_KEYS = ["minute_utc", "endpoint_base"]
+# Niveles del cubo de rollups: sufijo del CSV, columna de tiempo y nivel del que se deriva
+ROLLUP_LEVELS = [
+    ("minuto", "minute_utc", None),
+    ("hora", "hour_utc", "minute_utc"),
+    ("dia", "date_utc", "hour_utc"),
+]
+COUNT_COLUMNS = ["success_2xx", "client_4xx", "server_5xx", "parse_errors"]
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Normalizador por defecto (reglas equivalentes a normalize_endpoint)
+DEFAULT_NORMALIZER = EndpointNormalizer()
+
 
 def normalize_endpoint(endpoint: str) -> str:
     """
@@ -25,67 +46,89 @@ def normalize_endpoint(endpoint: str) -> str:
     1. Elimina query strings (después de "?")
     2. Reemplaza segmentos puramente numéricos por patrón genérico
     3. Reemplaza segmentos que contienen "ids", "keys", hashes (alphanuméricas con guiones)
+
+    Las reglas viven en endpoints.EndpointNormalizer (precompiladas y con memo).
     """
-    # Eliminar query string
-    endpoint = endpoint.split("?")[0]
-    
-    # Dividir en segmentos
-    parts = endpoint.split("/")
-    normalized_parts = []
-    
-    for part in parts:
-        if not part:
-            normalized_parts.append(part)
-        # Si es numérico puro, omitir (es un parámetro variable)
-        elif re.match(r'^\d+$', part):
-            continue
-        # Si contiene UUID, ID o hash-like (alphanuméricas con guiones), omitir
-        elif re.match(r'^[a-zA-Z0-9\-]{8,}$', part):
-            continue
-        else:
-            normalized_parts.append(part)
-    
-    # Reconstruir la ruta
-    result = "/".join(normalized_parts)
-    return result if result else "/"
+    return DEFAULT_NORMALIZER.normalize(endpoint)
 
 
 def load_jsonl(path: Path) -> pd.DataFrame:
     """
     Carga un archivo JSONL y retorna un DataFrame de pandas.
-    Valida que cada línea sea JSON válido.
+    Valida que cada línea sea JSON válido. Los archivos .gz, .bz2, .xz y .zst
+    se descomprimen de forma incremental.
     """
     rows = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                raise ValueError(f"JSON mal formado en línea {line_num}: {e}")
+    reader = JsonlReader(path)
+    for line_num, line in enumerate(reader, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON mal formado en línea {line_num}: {e}")
+    print(f"⏱️ Lectura: {reader.summary()}")
     return pd.DataFrame(rows)
 
 
-def compute_kpis(df: pd.DataFrame) -> pd.DataFrame:
+def iter_chunks(path: Path, chunk_size: int):
     """
-    Calcula KPIs diarios por endpoint normalizado.
-    
-    Procesa:
+    Lee el input en DataFrames de como mucho `chunk_size` filas. Para JSONL
+    solo hay en memoria las líneas del chunk actual; un .cols se recorre por
+    rebanadas de sus arrays mapeados.
+    """
+    if is_columnar(path):
+        df = load_columnar(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].copy()
+        return
+
+    rows = []
+    reader = JsonlReader(path)
+    for line_num, line in enumerate(reader, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON mal formado en línea {line_num}: {e}")
+        if len(rows) >= chunk_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+    print(f"⏱️ Lectura: {reader.summary()}")
+
+
+def validate_columns(df: pd.DataFrame):
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas en logs: {sorted(missing)}. Columnas actuales: {list(df.columns)}")
+
+
+def prepare_logs(df: pd.DataFrame, normalizer: EndpointNormalizer = None) -> pd.DataFrame:
+    """
+    Añade las columnas derivadas que usan las agregaciones:
     - Conversión de timestamps
     - Normalización de endpoints
     - Validación de parse_result
     - Clasificación de status codes
-    - Agrupación y agregación de métricas
+    Descarta las respuestas servidas por la caché HTTP de 01_ingestion_http
+    (campo `cache` = HIT / REVALIDATED): su latencia no es la del servicio.
     """
+    if "cache" in df.columns:
+        df = df[df["cache"].isna()].copy()
+
     # Normalizaciones
     df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], errors="coerce", utc=True)
     df["date_utc"] = df["timestamp_utc"].dt.date
     df["elapsed_ms"] = pd.to_numeric(df["elapsed_ms"], errors="coerce")
     
     # Normalizar endpoint: quitar parámetros y IDs numéricos
-    df["endpoint_base"] = df["endpoint"].apply(normalize_endpoint)
+    # (cada valor distinto se normaliza una sola vez)
+    df["endpoint_base"] = (normalizer or DEFAULT_NORMALIZER).normalize_series(df["endpoint"])
     
     # Clasificación de status codes
     df["is_2xx"] = df["status_code"].between(200, 299)
@@ -98,69 +141,419 @@ def compute_kpis(df: pd.DataFrame) -> pd.DataFrame:
         df["is_parse_error"] = df["parse_result"] != "ok"
     else:
         df["is_parse_error"] = False
+    return df
+
 
-    # Agrupación por día + endpoint_base
-    g = df.groupby(["date_utc", "endpoint_base"], as_index=False)
+def aggregate_frame(df: pd.DataFrame, normalizer: EndpointNormalizer = None, keys=GROUP_KEYS):
+    """Agregados y sketch de latencias de un DataFrame completo (o chunk)."""
+    return partial_aggregates(prepare_logs(df, normalizer), keys)
 
-    # Función auxiliar para calcular percentil 90 usando numpy
-    def p90(x):
-        return np.percentile(x.dropna(), 90) if len(x.dropna()) > 0 else 0
 
-    kpi = g.agg(
+def compute_kpis(df: pd.DataFrame, normalizer: EndpointNormalizer = None) -> pd.DataFrame:
+    """
+    Calcula KPIs diarios por endpoint normalizado.
+    
+    Procesa:
+    - Conversión de timestamps
+    - Normalización de endpoints
+    - Validación de parse_result
+    - Clasificación de status codes
+    - Agrupación y agregación de métricas
+
+    Los percentiles salen del sketch de latencias (error relativo <= 1%), igual
+    que en el modo por chunks, así ambos caminos dan el mismo resultado.
+    """
+    return finalize(*aggregate_frame(df, normalizer))
+
+
+# -----------------------------
+# Agregados parciales (mergeables)
+# -----------------------------
+def partial_aggregates(df: pd.DataFrame, keys=GROUP_KEYS):
+    """
+    Agregados parciales de un chunk ya preparado: conteos y sumas por grupo
+    (mergeables sumando) y el sketch de latencias de cada grupo.
+    """
+    # La columna por minuto solo se calcula cuando se pide el cubo de rollups
+    if "minute_utc" in keys and "minute_utc" not in df.columns:
+        df["minute_utc"] = df["timestamp_utc"].dt.floor("min")
+    # elapsed_ms trae dos decimales: sumar centésimas enteras hace la suma exacta
+    # e independiente del orden en que se combinen los parciales (chunks,
+    # workers, estado incremental)
+    df["elapsed_x100"] = df["elapsed_ms"].mul(100).round()
+    agg = df.groupby(keys, observed=True, sort=False).agg(
         requests_total=("status_code", "count"),
         success_2xx=("is_2xx", "sum"),
         client_4xx=("is_4xx", "sum"),
         server_5xx=("is_5xx", "sum"),
         parse_errors=("is_parse_error", "sum"),
-        avg_elapsed_ms=("elapsed_ms", "mean"),
-        p90_elapsed_ms=("elapsed_ms", p90),
-    )
+        elapsed_sum_x100=("elapsed_x100", "sum"),
+        elapsed_count=("elapsed_ms", "count"),
+    ).reset_index()
+    agg["elapsed_sum_x100"] = agg["elapsed_sum_x100"].astype("int64")
+    agg["endpoint_base"] = agg["endpoint_base"].astype(object)
+    sketch = latency_sketch.build(df, keys)
+    sketch["endpoint_base"] = sketch["endpoint_base"].astype(object)
+    return agg, sketch
 
-    # Convertir a int las columnas de conteo
-    kpi[["success_2xx", "client_4xx", "server_5xx", "parse_errors"]] = \
-        kpi[["success_2xx", "client_4xx", "server_5xx", "parse_errors"]].astype(int)
-    
-    # Redondeos para promedios
-    kpi["avg_elapsed_ms"] = kpi["avg_elapsed_ms"].round(2)
-    kpi["p90_elapsed_ms"] = kpi["p90_elapsed_ms"].round(2)
 
-    # Orden final
-    kpi = kpi.sort_values(["date_utc", "endpoint_base"]).reset_index(drop=True)
-    return kpi
+def merge_aggregates(parts, keys=GROUP_KEYS) -> pd.DataFrame:
+    parts = [p for p in parts if p is not None]
+    return pd.concat(parts, ignore_index=True).groupby(keys, sort=False).sum().reset_index()
 
 
-def main(input_path: Path, output_path: Path):
+def finalize(agg: pd.DataFrame, sketch: pd.DataFrame, keys=GROUP_KEYS) -> pd.DataFrame:
+    """Convierte agregados parciales ya combinados en la tabla de KPIs final."""
+    kpi = agg[keys + ["requests_total"] + COUNT_COLUMNS].copy()
+    kpi[["requests_total"] + COUNT_COLUMNS] = kpi[["requests_total"] + COUNT_COLUMNS].astype(int)
+    kpi["avg_elapsed_ms"] = (agg["elapsed_sum_x100"] / agg["elapsed_count"].where(agg["elapsed_count"] > 0) / 100).round(2)
+
+    percentiles = latency_sketch.quantile_table(sketch, keys).drop(columns="requests")
+    kpi = kpi.merge(percentiles, on=keys, how="left")
+    for name in latency_sketch.QUANTILE_COLUMNS.values():
+        kpi[name] = kpi[name].fillna(0).round(2)
+    # t_load_kpi.ktr lee el CSV por posición: p90 justo después de avg_elapsed_ms
+    extra = [name for name in latency_sketch.QUANTILE_COLUMNS.values() if name != "p90_elapsed_ms"]
+    kpi = kpi[keys + ["requests_total"] + COUNT_COLUMNS + ["avg_elapsed_ms", "p90_elapsed_ms"] + extra]
+    return kpi.sort_values(keys).reset_index(drop=True)
+
+
+def rollup_cube(agg: pd.DataFrame, sketch: pd.DataFrame):
+    """
+    Deriva los niveles hora y día combinando los agregados por minuto (y la
+    hora a partir de ellos), sin volver a leer los logs. Devuelve
+    {sufijo: (agg, sketch, keys)} para minuto, hora y día.
+    """
+    levels = {}
+    for suffix, column, source in ROLLUP_LEVELS:
+        keys = [column, "endpoint_base"]
+        if source is not None:
+            def coarser(frame):
+                times = frame[source]
+                value = times.dt.date if column == "date_utc" else times.dt.floor("h")
+                return frame.drop(columns=source).assign(**{column: value})
+            agg = merge_aggregates([coarser(agg)], keys)
+            sketch = latency_sketch.merge([coarser(sketch)], keys)
+        levels[suffix] = (agg, sketch, keys)
+    return levels
+
+
+def rollup_path(output_path: Path, suffix: str) -> Path:
+    """kpi_por_endpoint_dia.csv → kpi_por_endpoint_{minuto,hora,dia}.csv"""
+    stem = output_path.stem[:-len("_dia")] if output_path.stem.endswith("_dia") else output_path.stem
+    return output_path.with_name(f"{stem}_{suffix}{output_path.suffix}")
+
+
+# -----------------------------
+# Agregación por chunks (memoria acotada)
+# -----------------------------
+def aggregate_chunked(input_path: Path, chunk_size: int, normalizer: EndpointNormalizer = None, keys=GROUP_KEYS):
+    """
+    Agrega el input leyendo `chunk_size` líneas cada vez. Los parciales se
+    combinan tras cada chunk, así que la memoria depende del tamaño del chunk
+    y del número de grupos (día x endpoint), no del tamaño del input.
+    """
+    agg, sketch, rows, chunks = reduce_chunks(iter_chunks(input_path, chunk_size), normalizer, keys)
+    print(f"✅ {rows} registros procesados en {chunks} chunks de hasta {chunk_size} filas")
+    if agg is None:
+        raise ValueError(f"El input no contiene registros: {input_path}")
+    return agg, sketch
+
+
+def reduce_chunks(chunks, normalizer: EndpointNormalizer = None, keys=GROUP_KEYS):
+    """Combina los agregados parciales de cada chunk; devuelve (agg, sketch, filas, chunks)."""
+    agg = sketch = None
+    rows = count = 0
+    for chunk in chunks:
+        validate_columns(chunk)
+        part_agg, part_sketch = partial_aggregates(prepare_logs(chunk, normalizer), keys)
+        agg = merge_aggregates([agg, part_agg], keys)
+        sketch = latency_sketch.merge([sketch, part_sketch], keys)
+        rows += len(chunk)
+        count += 1
+    return agg, sketch, rows, count
+
+
+# -----------------------------
+# Modo paralelo (rangos de bytes / varios archivos)
+# -----------------------------
+def split_byte_ranges(path: Path, parts: int):
+    """
+    Divide un JSONL sin comprimir en `parts` rangos [inicio, fin) alineados a
+    inicio de línea: cada frontera se mueve hasta después del siguiente "\n".
+    """
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts - 1, 0))
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def work_units(input_paths, workers: int):
+    """
+    Unidades de trabajo del pool: rangos de bytes de cada JSONL plano, rangos
+    de filas de cada .cols y archivos comprimidos completos (no se pueden
+    dividir). Cada archivo se reparte en función de su peso en el total.
+    """
+    total = sum(p.stat().st_size for p in input_paths if not is_columnar(p)) or 1
+    units = []
+    for path in input_paths:
+        if is_columnar(path):
+            rows = len(load_columnar(path, columns=["status_code"]))
+            step = -(-rows // workers) if rows else 1
+            units += [("cols", path, start, min(start + step, rows)) for start in range(0, rows, step)]
+        elif compression_for(path):
+            units.append(("file", path, 0, None))
+        else:
+            parts = max(1, round(workers * path.stat().st_size / total))
+            units += [("range", path, start, end) for start, end in split_byte_ranges(path, parts)]
+    return units
+
+
+def iter_unit_chunks(unit, chunk_size: int):
+    kind, path, start, end = unit
+    if kind == "file":
+        yield from iter_chunks(path, chunk_size)
+        return
+    if kind == "cols":
+        df = load_columnar(path)
+        for pos in range(start, end, chunk_size):
+            yield df.iloc[pos:min(pos + chunk_size, end)].copy()
+        return
+
+    rows = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON mal formado en {path.name} antes del byte {position}: {e}")
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+
+
+def aggregate_unit(unit, chunk_size: int, endpoint_rules=None, keys=GROUP_KEYS):
+    """Tarea de un proceso del pool: parciales de su unidad + estadísticas del normalizador."""
+    normalizer = EndpointNormalizer.from_file(endpoint_rules) if endpoint_rules else EndpointNormalizer()
+    agg, sketch, rows, _ = reduce_chunks(iter_unit_chunks(unit, chunk_size), normalizer, keys)
+    return agg, sketch, rows, (normalizer.hits, normalizer.misses, normalizer.rule_counts)
+
+
+def aggregate_parallel(input_paths, workers: int, chunk_size: int, normalizer: EndpointNormalizer,
+                       endpoint_rules=None, keys=GROUP_KEYS):
+    """
+    Reparte el input en unidades, las agrega en un pool de `workers` procesos y
+    combina los parciales (conteos, sumas y sketches) en un reduce final. El
+    resultado es el mismo que en un solo proceso.
+    """
+    units = work_units(input_paths, workers)
+    print(f"⚙️ {len(units)} unidades de trabajo en {workers} procesos")
+    aggs, sketches, total = [], [], 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(aggregate_unit, unit, chunk_size, endpoint_rules, keys) for unit in units]
+        for future in futures:
+            agg, sketch, rows, (hits, misses, rule_counts) = future.result()
+            aggs.append(agg)
+            sketches.append(sketch)
+            total += rows
+            normalizer.hits += hits
+            normalizer.misses += misses
+            for name, count in rule_counts.items():
+                normalizer.rule_counts[name] = normalizer.rule_counts.get(name, 0) + count
+
+    aggs = [a for a in aggs if a is not None]
+    if not aggs:
+        raise ValueError(f"El input no contiene registros: {', '.join(map(str, input_paths))}")
+    print(f"✅ {total} registros procesados")
+    return merge_aggregates(aggs, keys), latency_sketch.merge(sketches, keys)
+
+
+# -----------------------------
+# Modo incremental (checkpoint + upsert)
+# -----------------------------
+def run_incremental(input_path: Path, output_path: Path, chunk_size: int,
+                    normalizer: EndpointNormalizer, endpoint_rules: Path = None):
+    """
+    Procesa solo las líneas añadidas desde el último checkpoint, combina sus
+    agregados con el estado guardado y reescribe en el CSV únicamente las filas
+    (date_utc, endpoint_base) afectadas.
+    """
+    directory = incremental.state_dir(output_path)
+    sketch_file = latency_sketch.sketch_path(output_path)
+    rules = incremental.rules_hash(endpoint_rules)
+    checkpoint, reason = incremental.load_checkpoint(directory, input_path, rules)
+    if checkpoint and not (output_path.exists() and sketch_file.exists()):
+        checkpoint, reason = None, "faltan las salidas de la ejecución anterior"
+
+    if checkpoint:
+        agg, sketch = incremental.load_aggregates(directory), latency_sketch.load(sketch_file)
+        offset, rows = checkpoint["offset"], checkpoint["rows"]
+        print(f"🔖 Checkpoint: {rows} registros ya procesados, se continúa desde el byte {offset:,}")
+    else:
+        agg = sketch = None
+        offset = rows = 0
+        print(f"🔖 Procesamiento completo: {reason}")
+
+    new_agg = new_sketch = None
+    new_rows = 0
+    for records, offset in incremental.iter_appended(input_path, offset, chunk_size):
+        if not records:
+            continue
+        chunk = pd.DataFrame(records)
+        validate_columns(chunk)
+        part_agg, part_sketch = partial_aggregates(prepare_logs(chunk, normalizer))
+        new_agg = merge_aggregates([new_agg, part_agg])
+        new_sketch = latency_sketch.merge([new_sketch, part_sketch], GROUP_KEYS)
+        new_rows += len(chunk)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    if new_agg is None:
+        incremental.save_checkpoint(directory, input_path, offset, rows, rules)
+        print(f"✅ Sin registros nuevos desde el checkpoint ({rows} registros en total)")
+        return
+
+    agg = merge_aggregates([agg, new_agg])
+    sketch = latency_sketch.merge([sketch, new_sketch], GROUP_KEYS)
+
+    # Solo se recalculan los grupos que recibieron datos nuevos
+    affected = new_agg[GROUP_KEYS]
+    updated = finalize(agg.merge(affected, on=GROUP_KEYS), sketch.merge(affected, on=GROUP_KEYS))
+    if checkpoint:
+        replaced = incremental.upsert_rows(output_path, updated, GROUP_KEYS)
+    else:
+        updated.to_csv(output_path, index=False)
+        replaced = 0
+
+    # El checkpoint va al final: si algo falla antes, la próxima ejecución repite el tramo
+    latency_sketch.save(sketch, sketch_file)
+    incremental.save_aggregates(directory, agg)
+    incremental.save_checkpoint(directory, input_path, offset, rows + new_rows, rules)
+
+    print(f"🔁 Normalización: {normalizer.summary()}")
+    print(f"✅ {new_rows} registros nuevos ({rows + new_rows} en total)")
+    print(f"✅ Filas actualizadas: {replaced}, nuevas: {len(updated) - replaced} → {output_path.resolve()}")
+    print(f"✅ Estado: {directory.resolve()}")
+
+
+def main(input_path: Path, output_path: Path, chunk_size: int = 0, endpoint_rules: Path = None,
+         incremental_mode: bool = False, workers: int = 1, rollups: bool = False,
+         raw_store_dir: Path = None, date_from: str = None, date_to: str = None):
     """
     Función principal.
     
     Args:
-        input_path: Ruta del archivo JSONL de entrada (out/datos.jsonl)
+        input_path: Ruta del archivo JSONL de entrada (out/datos.jsonl), o lista de rutas
         output_path: Ruta del archivo CSV de salida (out/kpi_por_endpoint_dia.csv)
+        chunk_size: Filas por chunk; > 0 activa la agregación con memoria acotada
+        endpoint_rules: JSON con plantillas / reglas de normalización de endpoints
+        incremental_mode: Procesa solo lo añadido desde el último checkpoint
+        workers: Procesos para el modo paralelo (también se activa con varios inputs)
+        rollups: Genera el cubo minuto/hora/día en una sola pasada (un CSV por nivel)
+        raw_store_dir: Re-agrega desde el almacén de eventos crudos en lugar del input
+        date_from / date_to: Rango de días (YYYY-MM-DD, inclusive) a leer del almacén
     """
-    if not input_path.exists():
-        raise FileNotFoundError(f"No existe el input JSONL: {input_path.resolve()}")
+    normalizer = EndpointNormalizer.from_file(endpoint_rules) if endpoint_rules else DEFAULT_NORMALIZER
+    if rollups and incremental_mode:
+        raise ValueError("El cubo de rollups no admite el modo incremental")
+    keys = MINUTE_KEYS if rollups else GROUP_KEYS
 
-    print(f"📖 Leyendo: {input_path.resolve()}")
-    df = load_jsonl(input_path)
-    print(f"✅ {len(df)} registros cargados")
+    if raw_store_dir:
+        if incremental_mode or workers > 1:
+            raise ValueError("--raw-store no admite --incremental ni --workers")
+        print(f"📊 Procesando KPIs desde el almacén {raw_store_dir.resolve()}...")
+        chunks = raw_store.iter_events(raw_store_dir, date_from, date_to, chunk_size or DEFAULT_CHUNK_SIZE)
+        agg, sketch, rows, _ = reduce_chunks(chunks, normalizer, keys)
+        print(f"✅ {rows} registros procesados")
+        if agg is None:
+            raise ValueError(f"El almacén no contiene eventos en el rango pedido: {raw_store_dir}")
+        write_results(agg, sketch, output_path, normalizer, rollups)
+        return
 
-    # Validar columnas requeridas
-    required = {"timestamp_utc", "endpoint", "status_code", "elapsed_ms"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"Faltan columnas en logs: {sorted(missing)}. Columnas actuales: {list(df.columns)}")
+    input_paths = input_path if isinstance(input_path, list) else [input_path]
+    for path in input_paths:
+        if not path.exists():
+            raise FileNotFoundError(f"No existe el input JSONL: {path.resolve()}")
+
+    for path in input_paths:
+        print(f"📖 Leyendo: {path.resolve()}")
+    if workers > 1 or len(input_paths) > 1:
+        if incremental_mode:
+            raise ValueError("El modo incremental admite un solo input y un solo proceso")
+        print("📊 Procesando KPIs en paralelo...")
+        agg, sketch = aggregate_parallel(input_paths, max(workers, 1), chunk_size or DEFAULT_CHUNK_SIZE,
+                                         normalizer, endpoint_rules, keys)
+        write_results(agg, sketch, output_path, normalizer, rollups)
+        return
+
+    input_path = input_paths[0]
+    if incremental_mode:
+        if compression_for(input_path) or is_columnar(input_path):
+            print("⚠️ El modo incremental requiere JSONL sin comprimir: se procesa el input completo")
+        else:
+            run_incremental(input_path, output_path, chunk_size or DEFAULT_CHUNK_SIZE, normalizer, endpoint_rules)
+            return
+
+    if chunk_size > 0:
+        print("📊 Procesando KPIs por chunks...")
+        agg, sketch = aggregate_chunked(input_path, chunk_size, normalizer, keys)
+    else:
+        df = load_columnar(input_path) if is_columnar(input_path) else load_jsonl(input_path)
+        print(f"✅ {len(df)} registros cargados")
+
+        # Validar columnas requeridas
+        validate_columns(df)
 
-    print(f"📊 Procesando KPIs...")
-    kpis = compute_kpis(df)
+        print(f"📊 Procesando KPIs...")
+        agg, sketch = aggregate_frame(df, normalizer, keys)
+    write_results(agg, sketch, output_path, normalizer, rollups)
+
+
+def write_results(agg: pd.DataFrame, sketch: pd.DataFrame, output_path: Path, normalizer: EndpointNormalizer,
+                  rollups: bool = False):
+    """CSV diario o, con rollups, un CSV (y su sketch) por nivel del cubo."""
+    if not rollups:
+        write_outputs(finalize(agg, sketch), sketch, output_path, normalizer)
+        return
+    print(f"🔁 Normalización: {normalizer.summary()}")
+    for suffix, (level_agg, level_sketch, keys) in rollup_cube(agg, sketch).items():
+        write_outputs(finalize(level_agg, level_sketch, keys), level_sketch, rollup_path(output_path, suffix),
+                      keys=keys)
+
+
+def write_outputs(kpis: pd.DataFrame, sketch: pd.DataFrame, output_path: Path,
+                  normalizer: EndpointNormalizer = None, keys=GROUP_KEYS):
+    if normalizer is not None:
+        print(f"🔁 Normalización: {normalizer.summary()}")
 
     # Crear directorio de salida
     output_path.parent.mkdir(parents=True, exist_ok=True)
     kpis.to_csv(output_path, index=False)
+    sketch_file = latency_sketch.sketch_path(output_path)
+    latency_sketch.save(sketch, sketch_file)
 
     print(f"✅ KPIs generados: {output_path.resolve()}")
-    print(f"✅ Filas: {len(kpis)} (agrupado por date_utc + endpoint_base)")
-    print(f"\nPrimeras 5 filas:")
-    print(kpis.head())
+    print(f"✅ Sketches de latencia: {sketch_file.resolve()}")
+    print(f"✅ Filas: {len(kpis)} (agrupado por {' + '.join(keys)})")
+    if keys == GROUP_KEYS:
+        print(f"\nPrimeras 5 filas:")
+        print(kpis.head())
 
 
 
@@ -179,8 +572,9 @@ Ejemplos de uso:
     parser.add_argument(
         "--input", 
         type=str, 
-        default=str(DEFAULT_INPUT), 
-        help=f"Ruta del archivo JSONL de entrada (default: {DEFAULT_INPUT})"
+        nargs="+",
+        default=[str(DEFAULT_INPUT)], 
+        help=f"Ruta(s) del archivo JSONL (o directorio .cols) de entrada (default: {DEFAULT_INPUT})"
     )
     parser.add_argument(
         "--output", 
@@ -188,11 +582,50 @@ Ejemplos de uso:
         default=str(OUT_CSV), 
         help=f"Ruta del archivo CSV de salida (default: {OUT_CSV})"
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=0,
+        help="Procesa el input en chunks de N filas con memoria acotada (default: 0 = todo en memoria)"
+    )
+    parser.add_argument(
+        "--endpoint-rules",
+        type=str,
+        default=None,
+        help='JSON de reglas de normalización, p. ej. {"templates": ["/users/{id}"]}'
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Procesa solo las líneas nuevas desde el último checkpoint y actualiza las filas afectadas"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"Procesos para agregar rangos del input en paralelo (núcleos disponibles: {os.cpu_count()})"
+    )
+    parser.add_argument(
+        "--rollups",
+        action="store_true",
+        help="Genera KPIs por minuto, hora y día en una pasada (*_minuto.csv, *_hora.csv, *_dia.csv)"
+    )
+    parser.add_argument(
+        "--raw-store",
+        type=str,
+        default=None,
+        help="Re-agrega desde el almacén de eventos crudos por día (raw_store.py) en lugar de --input"
+    )
+    parser.add_argument("--date-from", type=str, default=None, help="Primer día a leer del almacén (YYYY-MM-DD)")
+    parser.add_argument("--date-to", type=str, default=None, help="Último día a leer del almacén (YYYY-MM-DD)")
     
     args = parser.parse_args()
     
     try:
-        main(Path(args.input), Path(args.output))
+        inputs = [Path(p) for p in args.input]
+        main(inputs if len(inputs) > 1 else inputs[0], Path(args.output), args.chunk_size,
+             args.endpoint_rules, args.incremental, args.workers, args.rollups,
+             Path(args.raw_store) if args.raw_store else None, args.date_from, args.date_to)
     except Exception as e:
         print(f"❌ Error: {e}")
         exit(1)
@@ -0,0 +1,110 @@
+"""
+Motor de normalización de endpoints basado en reglas.
+
+Orden de aplicación sobre cada endpoint (sin query string):
+1. Plantillas completas, p. ej. "/users/{id}" o "/orders/{id:\\d+}/items":
+   la primera que encaja devuelve la plantilla ("/orders/{id}/items").
+2. Reglas por segmento: un segmento que encaja con cualquier regla se omite.
+   Las reglas por defecto reproducen normalize_endpoint() original
+   (numéricos puros y alfanuméricos con guiones de 8+ caracteres, lo que
+   incluye UUIDs y hashes).
+
+Cada endpoint distinto se normaliza una sola vez: las series se factorizan y
+el resultado vuelve a las filas a través de los códigos del Categorical.
+"""
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEGMENT_RULES = [
+    {"name": "numeric_id", "pattern": r"^\d+$"},
+    {"name": "uuid", "pattern": r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"},
+    {"name": "hash", "pattern": r"^[0-9a-fA-F]{16,}$"},
+    {"name": "opaque_id", "pattern": r"^[a-zA-Z0-9\-]{8,}$"},
+]
+PLACEHOLDER = re.compile(r"\{(\w+)(?::([^{}]+))?\}")
+
+
+def compile_template(template: str):
+    """'/users/{id}' → regex anclada; cada {nombre} encaja con un segmento."""
+    pattern, last = "", 0
+    for m in PLACEHOLDER.finditer(template):
+        pattern += re.escape(template[last:m.start()]) + f"(?:{m.group(2) or '[^/]+'})"
+        last = m.end()
+    return re.compile("^" + pattern + re.escape(template[last:]) + "/?$")
+
+
+class EndpointNormalizer:
+    """Tabla de reglas precompilada con memo de endpoints ya normalizados."""
+
+    def __init__(self, templates=(), segment_rules=None):
+        # Se devuelve la plantilla sin las expresiones: "/orders/{id:\d+}" → "/orders/{id}"
+        self.templates = [(PLACEHOLDER.sub(r"{\1}", t), compile_template(t)) for t in templates]
+        rules = DEFAULT_SEGMENT_RULES if segment_rules is None else segment_rules
+        self.segment_rules = [(r["name"], re.compile(r["pattern"])) for r in rules]
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.rule_counts = {name: 0 for name, _ in self.segment_rules}
+        self.rule_counts.update({t: 0 for t, _ in self.templates})
+
+    @classmethod
+    def from_file(cls, path: Path):
+        """
+        Carga reglas desde JSON:
+        {"templates": ["/users/{id}"], "segment_rules": [{"name": ..., "pattern": ...}]}
+        Sin "segment_rules" se usan las reglas por defecto.
+        """
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(config.get("templates", []), config.get("segment_rules"))
+
+    def _apply_rules(self, endpoint: str) -> str:
+        path = endpoint.split("?")[0]
+        for template, regex in self.templates:
+            if regex.match(path):
+                self.rule_counts[template] += 1
+                return template
+
+        parts = []
+        for part in path.split("/"):
+            if part:
+                rule = next((name for name, regex in self.segment_rules if regex.match(part)), None)
+                if rule is not None:
+                    self.rule_counts[rule] += 1
+                    continue
+            parts.append(part)
+        result = "/".join(parts)
+        return result if result else "/"
+
+    def normalize(self, endpoint: str) -> str:
+        result = self.cache.get(endpoint)
+        if result is None:
+            result = self.cache[endpoint] = self._apply_rules(endpoint)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def normalize_series(self, endpoints: pd.Series) -> pd.Series:
+        """
+        Normaliza una serie completa: factoriza, aplica las reglas solo a los
+        valores distintos y devuelve un Categorical con el resultado por fila.
+        """
+        codes, uniques = pd.factorize(endpoints)
+        normalized = np.array([self.normalize(u) for u in uniques], dtype=object)
+        self.hits += int((codes >= 0).sum()) - len(uniques)
+
+        base_codes, bases = pd.factorize(normalized)
+        row_codes = np.where(codes >= 0, base_codes[codes] if len(base_codes) else -1, -1)
+        return pd.Series(pd.Categorical.from_codes(row_codes, categories=bases), index=endpoints.index)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        used = ", ".join(f"{name}={count}" for name, count in self.rule_counts.items() if count)
+        return (f"{total:,} endpoints, {self.misses} distintos normalizados "
+                f"(hits {self.hits:,}, misses {self.misses}, {rate:.1f}% aciertos)"
+                + (f" | reglas: {used}" if used else ""))
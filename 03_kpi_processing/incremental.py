@@ -0,0 +1,141 @@
+"""
+Estado del modo incremental de calcular_kpis.
+
+Junto al CSV de KPIs se guarda un directorio `<csv>.state/` con:
+- checkpoint.json: identidad del input (dispositivo, inodo, hash de la primera
+  línea), offset en bytes hasta la última línea completa procesada y filas.
+- aggregates.csv: agregados parciales por (date_utc, endpoint_base), con las
+  sumas necesarias para recombinar (elapsed_sum_x100, suma exacta en
+  centésimas de ms, / elapsed_count).
+Los sketches de latencia son el sidecar `*.sketch.csv` que ya escribe el
+modo normal, así que también forman parte del estado.
+
+Si el input cambia de identidad (rotado, truncado o reescrito) o cambian las
+reglas de normalización, el estado se descarta y se reprocesa desde el inicio.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+CHECKPOINT_FILE = "checkpoint.json"
+AGGREGATES_FILE = "aggregates.csv"
+IDENTITY_BYTES = 4096
+SUM_COLUMN = "elapsed_sum_x100"
+
+
+def state_dir(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.stem}.state")
+
+
+def first_line_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.readline(IDENTITY_BYTES)).hexdigest()
+
+
+def rules_hash(rules_path) -> str:
+    if not rules_path:
+        return None
+    return hashlib.sha256(Path(rules_path).read_bytes()).hexdigest()
+
+
+def file_identity(path: Path) -> dict:
+    st = path.stat()
+    return {
+        "path": str(path.resolve()),
+        "device": st.st_dev,
+        "inode": st.st_ino,
+        "first_line_sha256": first_line_hash(path),
+    }
+
+
+def load_checkpoint(directory: Path, input_path: Path, rules: str):
+    """
+    Checkpoint válido para `input_path` o None si hay que empezar de cero.
+    Devuelve también el motivo para informarlo en el resumen.
+    """
+    path = directory / CHECKPOINT_FILE
+    if not path.exists() or not (directory / AGGREGATES_FILE).exists():
+        return None, "sin checkpoint previo"
+    with open(directory / AGGREGATES_FILE, encoding="utf-8") as f:
+        if SUM_COLUMN not in f.readline().strip().split(","):
+            return None, "estado de una versión anterior (sumas de latencia en coma flotante)"
+    checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    if checkpoint.get("identity") != file_identity(input_path):
+        return None, "el input cambió de identidad (rotado o reescrito)"
+    if checkpoint.get("rules_sha256") != rules:
+        return None, "cambiaron las reglas de normalización"
+    if input_path.stat().st_size < checkpoint["offset"]:
+        return None, "el input es más corto que el checkpoint (truncado)"
+    return checkpoint, None
+
+
+def save_checkpoint(directory: Path, input_path: Path, offset: int, rows: int, rules: str):
+    """Escribe el checkpoint de forma atómica (último paso de cada ejecución)."""
+    checkpoint = {"identity": file_identity(input_path), "offset": offset, "rows": rows, "rules_sha256": rules}
+    tmp = directory / f"{CHECKPOINT_FILE}.tmp"
+    tmp.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    os.replace(tmp, directory / CHECKPOINT_FILE)
+
+
+def _parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+    df["date_utc"] = pd.to_datetime(df["date_utc"]).dt.date
+    return df
+
+
+def load_aggregates(directory: Path) -> pd.DataFrame:
+    return _parse_dates(pd.read_csv(directory / AGGREGATES_FILE, dtype={"endpoint_base": object}))
+
+
+def save_aggregates(directory: Path, agg: pd.DataFrame):
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f"{AGGREGATES_FILE}.tmp"
+    agg.to_csv(tmp, index=False)
+    os.replace(tmp, directory / AGGREGATES_FILE)
+
+
+def iter_appended(path: Path, offset: int, chunk_size: int):
+    """
+    Lee las líneas completas a partir de `offset` en bloques de `chunk_size`.
+    Produce (registros, offset tras el bloque); una última línea sin "\\n" se
+    deja para la próxima ejecución (el archivo puede estar escribiéndose).
+    """
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON mal formado antes del byte {offset}: {e}")
+            if len(records) >= chunk_size:
+                yield records, offset
+                records = []
+    yield records, offset
+
+
+def upsert_rows(output_path: Path, rows: pd.DataFrame, keys) -> int:
+    """
+    Sustituye en el CSV existente las filas de `keys` presentes en `rows` y
+    añade las nuevas. Devuelve el número de filas que ya existían.
+    """
+    if not output_path.exists():
+        rows.to_csv(output_path, index=False)
+        return 0
+    existing = _parse_dates(pd.read_csv(output_path, dtype={"endpoint_base": object}))
+    affected = pd.MultiIndex.from_frame(rows[keys])
+    stale = pd.MultiIndex.from_frame(existing[keys]).isin(affected)
+    merged = pd.concat([existing[~stale], rows], ignore_index=True).reindex(columns=rows.columns)
+    merged = merged.sort_values(keys).reset_index(drop=True)
+    tmp = output_path.with_name(f"{output_path.name}.tmp")
+    merged.to_csv(tmp, index=False)
+    os.replace(tmp, output_path)
+    return int(stale.sum())
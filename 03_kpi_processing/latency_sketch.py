@@ -0,0 +1,162 @@
+"""
+Sketch de latencias mergeable: histograma de buckets logarítmicos.
+
+Cada valor v > 0 cae en el bucket i = ceil(log(v) / log(gamma)), con
+gamma = (1 + alpha) / (1 - alpha). Devolver el punto medio relativo del bucket
+garantiza un error relativo <= alpha en cualquier cuantil (mismo criterio que
+DDSketch). Como los buckets son fijos, dos sketches se combinan sumando los
+conteos del mismo bucket: sirve para juntar chunks, días o procesos.
+
+Los sketches de varios grupos se guardan como una tabla larga de pandas con
+las columnas de agrupación + `bucket` + `count`, y en disco como CSV junto al
+CSV de KPIs (`*.sketch.csv`), lo que permite sacar percentiles semanales o
+globales sin releer los logs:
+
+    python 03_kpi_processing/latency_sketch.py --sketch out/kpi_por_endpoint_dia.sketch.csv --period week
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = np.log(GAMMA)
+MIN_VALUE = 1e-3  # latencias <= 0 se cuentan en el bucket de este valor
+
+# Cuantiles publicados en el CSV de KPIs
+QUANTILE_COLUMNS = {
+    0.5: "p50_elapsed_ms",
+    0.9: "p90_elapsed_ms",
+    0.95: "p95_elapsed_ms",
+    0.99: "p99_elapsed_ms",
+}
+
+
+def bucket_index(values) -> np.ndarray:
+    values = np.maximum(np.asarray(values, dtype=np.float64), MIN_VALUE)
+    return np.ceil(np.log(values) / LOG_GAMMA).astype(np.int32)
+
+
+def bucket_value(index) -> np.ndarray:
+    """Valor representativo del bucket (error relativo <= RELATIVE_ACCURACY)."""
+    return 2 * np.power(GAMMA, np.asarray(index, dtype=np.float64)) / (GAMMA + 1)
+
+
+def build(df: pd.DataFrame, keys, value_col="elapsed_ms") -> pd.DataFrame:
+    """Sketch por grupo de `keys`: una fila por (grupo, bucket) con su conteo."""
+    valid = df[df[value_col].notna()]
+    buckets = pd.Series(bucket_index(valid[value_col].to_numpy()), index=valid.index, name="bucket")
+    return (
+        valid[keys].assign(bucket=buckets)
+        .groupby(keys + ["bucket"], observed=True, sort=False)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+
+
+def merge(sketches, keys) -> pd.DataFrame:
+    """Combina sketches (misma agrupación) sumando los conteos por bucket."""
+    sketches = [s for s in sketches if s is not None and len(s)]
+    if not sketches:
+        return pd.DataFrame(columns=keys + ["bucket", "count"])
+    return (
+        pd.concat(sketches, ignore_index=True)
+        .groupby(keys + ["bucket"], observed=True, sort=False)["count"]
+        .sum()
+        .reset_index()
+    )
+
+
+def quantiles(sketch: pd.DataFrame, keys, qs=(0.9,)) -> pd.DataFrame:
+    """
+    Cuantiles por grupo: para cada q, el bucket del elemento de rango q*(n-1).
+    Devuelve `keys` + una columna por cuantil, indexada por el nombre de q.
+    """
+    ordered = sketch.sort_values(keys + ["bucket"], kind="stable")
+    grouped = ordered.groupby(keys, observed=True, sort=False)["count"]
+    cumulative = grouped.cumsum()
+    total = grouped.transform("sum")
+
+    result = ordered[keys].drop_duplicates().reset_index(drop=True)
+    for q in qs:
+        reached = ordered[cumulative > q * (total - 1)]
+        first = reached.groupby(keys, observed=True, sort=False).head(1)
+        values = first[keys].assign(**{str(q): bucket_value(first["bucket"].to_numpy())})
+        result = result.merge(values, on=keys, how="left")
+    return result
+
+
+def quantile_table(sketch: pd.DataFrame, keys, qs=QUANTILE_COLUMNS) -> pd.DataFrame:
+    """`keys` + requests (valores en el sketch) + una columna pXX_elapsed_ms por cuantil."""
+    table = quantiles(sketch, keys, tuple(qs)).rename(columns={str(q): name for q, name in qs.items()})
+    counts = sketch.groupby(keys, observed=True, sort=False)["count"].sum().rename("requests").reset_index()
+    return counts.merge(table, on=keys, how="left")
+
+
+# -----------------------------
+# Serialización y rollups
+# -----------------------------
+def sketch_path(kpi_csv: Path) -> Path:
+    """Sidecar del CSV de KPIs: kpi_por_endpoint_dia.csv → kpi_por_endpoint_dia.sketch.csv"""
+    kpi_csv = Path(kpi_csv)
+    return kpi_csv.with_name(f"{kpi_csv.stem}.sketch.csv")
+
+
+def save(sketch: pd.DataFrame, path: Path):
+    """
+    Guarda el sketch como CSV. `value_ms` (valor representativo del bucket) se
+    incluye para que otros módulos calculen cuantiles sin conocer GAMMA.
+    """
+    out = sketch.assign(value_ms=bucket_value(sketch["bucket"].to_numpy()).round(4))
+    out = out.sort_values([c for c in out.columns if c not in ("count", "value_ms")])
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    out.to_csv(path, index=False)
+
+
+def load(path: Path) -> pd.DataFrame:
+    sketch = pd.read_csv(path, dtype={"endpoint_base": object})
+    if "date_utc" in sketch.columns:
+        sketch["date_utc"] = pd.to_datetime(sketch["date_utc"]).dt.date
+    return sketch.drop(columns=["value_ms"], errors="ignore")
+
+
+def rollup(sketch: pd.DataFrame, period="week", by_endpoint=True) -> pd.DataFrame:
+    """
+    Percentiles por semana (lunes UTC), día o periodo completo a partir de
+    sketches diarios, sumando los buckets de cada grupo.
+    """
+    sketch = sketch.copy()
+    if period == "week":
+        dates = pd.to_datetime(sketch["date_utc"])
+        sketch["week_utc"] = (dates - pd.to_timedelta(dates.dt.weekday, unit="D")).dt.date
+        keys = ["week_utc"]
+    elif period == "day":
+        keys = ["date_utc"]
+    else:
+        sketch["period"] = "global"
+        keys = ["period"]
+    if by_endpoint:
+        keys = keys + ["endpoint_base"]
+    merged = merge([sketch[keys + ["bucket", "count"]]], keys)
+    return quantile_table(merged, keys).sort_values(keys).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Percentiles semanales o globales desde un sketch diario")
+    parser.add_argument("--sketch", required=True, help="CSV de sketches (*.sketch.csv)")
+    parser.add_argument("--period", choices=["day", "week", "global"], default="week")
+    parser.add_argument("--all-endpoints", action="store_true", help="Agrega todos los endpoints juntos")
+    parser.add_argument("--output", help="CSV de salida (default: imprime en pantalla)")
+    args = parser.parse_args()
+
+    table = rollup(load(Path(args.sketch)), args.period, by_endpoint=not args.all_endpoints)
+    for name in QUANTILE_COLUMNS.values():
+        table[name] = table[name].round(2)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"✅ {len(table)} filas → {args.output}")
+    else:
+        print(table.to_string(index=False))
@@ -0,0 +1,396 @@
+"""
+Almacén de eventos crudos particionado por día (un SQLite por date_utc).
+
+Estructura:
+    raw_store/
+        sources.json          # fuentes ingeridas (identidad, source_id, filas)
+        2026-02-06.db         # tabla events de ese día (UTC)
+        2026-02-07.db
+
+Cada partición guarda los eventos con columnas tipadas (timestamp en epoch ms,
+status_code entero, elapsed_ms real) e índices por endpoint y status_code, así
+que una nueva métrica, otro percentil u otra regla de normalización se
+recalcula leyendo solo los días pedidos, sin volver a parsear el JSONL.
+Cada evento lleva el `source` de la fuente de la que vino: volver a ingerir una
+fuente (porque cambió o con --force) sustituye sus eventos en lugar de duplicarlos.
+
+
+    python 03_kpi_processing/raw_store.py ingest --store out/raw_store --input 02_simulation_logs/out/http_logs.jsonl.gz
+    python 03_kpi_processing/calcular_kpis.py --raw-store out/raw_store --date-from 2026-02-01 --date-to 2026-02-07
+    python 03_kpi_processing/raw_store.py prune --store out/raw_store --before 2026-01-01
+    python 03_kpi_processing/raw_store.py compact --store out/raw_store
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from logformat.compresion import JsonlReader
+from logformat.columnar import META_FILE, is_columnar, load_columnar
+
+SOURCES_FILE = "sources.json"
+PARTITION_SUFFIX = ".db"
+INGEST_CHUNK = 200_000
+MS_PER_DAY = 86_400_000
+IDENTITY_BYTES = 4096
+
+COLUMNS = ["ts_ms", "endpoint", "http_method", "status_code", "elapsed_ms", "parse_result", "user_agent"]
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS events (
+  ts_ms INTEGER NOT NULL,
+  endpoint TEXT,
+  http_method TEXT,
+  status_code INTEGER,
+  elapsed_ms REAL,
+  parse_result TEXT,
+  user_agent TEXT,
+  source INTEGER
+)
+"""
+CREATE_SOURCE_INDEX = "CREATE INDEX IF NOT EXISTS idx_events_source ON events(source)"
+# Los índices se crean al cerrar la ingesta: en una partición nueva es más
+# rápido construirlos una vez que mantenerlos fila a fila
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_events_endpoint ON events(endpoint)",
+    "CREATE INDEX IF NOT EXISTS idx_events_status ON events(status_code)",
+    CREATE_SOURCE_INDEX,
+]
+
+
+# -----------------------------
+# Particiones
+# -----------------------------
+def partition_path(store: Path, day: str) -> Path:
+    return store / f"{day}{PARTITION_SUFFIX}"
+
+
+def list_partitions(store: Path, date_from: str = None, date_to: str = None):
+    """(día, ruta) de las particiones en [date_from, date_to], por nombre de archivo."""
+    if not store.exists():
+        return []
+    days = sorted(p.stem for p in store.glob(f"????-??-??{PARTITION_SUFFIX}"))
+    return [(d, partition_path(store, d)) for d in days
+            if (date_from is None or d >= date_from) and (date_to is None or d <= date_to)]
+
+
+def open_partition(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(CREATE_TABLE)
+    # Particiones anteriores a la columna source: se añade (nula) con su índice
+    if "source" not in [row[1] for row in conn.execute("PRAGMA table_info(events)")]:
+        conn.execute("ALTER TABLE events ADD COLUMN source INTEGER")
+        conn.execute(CREATE_SOURCE_INDEX)
+    return conn
+
+
+def partition_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in (path, Path(f"{path}-wal")) if p.exists())
+
+
+# -----------------------------
+# Fuentes ingeridas
+# -----------------------------
+def source_identity(path: Path) -> dict:
+    """Ruta, tamaño y hash del inicio del archivo (meta.json en un .cols)."""
+    target = path / META_FILE if is_columnar(path) else path
+    with open(target, "rb") as f:
+        head = hashlib.sha256(f.read(IDENTITY_BYTES)).hexdigest()
+    return {"path": str(path.resolve()), "size": target.stat().st_size, "head_sha256": head}
+
+
+def source_id(identity: dict) -> int:
+    """Id estable de una fuente (hash de su ruta), guardado en cada evento."""
+    return int(hashlib.sha256(identity["path"].encode()).hexdigest()[:15], 16)
+
+
+def load_sources(store: Path) -> list:
+    path = store / SOURCES_FILE
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+
+
+def save_sources(store: Path, sources: list):
+    tmp = store / f"{SOURCES_FILE}.tmp"
+    tmp.write_text(json.dumps(sources, indent=2), encoding="utf-8")
+    os.replace(tmp, store / SOURCES_FILE)
+
+
+# -----------------------------
+# Ingesta
+# -----------------------------
+def iter_source_chunks(path: Path, chunk_size: int):
+    """DataFrames de como mucho `chunk_size` eventos de un JSONL (plano o comprimido) o .cols."""
+    if is_columnar(path):
+        df = load_columnar(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    rows = []
+    reader = JsonlReader(path)
+    for line_num, line in enumerate(reader, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON mal formado en línea {line_num}: {e}")
+        if len(rows) >= chunk_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+    print(f"⏱️ Lectura: {reader.summary()}")
+
+
+def typed_events(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columnas tipadas del almacén + `day` (días desde epoch); se descartan los
+    eventos sin timestamp válido y los servidos por la caché HTTP (`cache`).
+    """
+    ts = pd.to_datetime(chunk["timestamp_utc"], utc=True, errors="coerce", format="ISO8601")
+    valid = ts.notna()
+    if "cache" in chunk.columns:
+        valid &= chunk["cache"].isna()
+    events = pd.DataFrame({"ts_ms": ts[valid].dt.as_unit("ms").astype("int64")})
+    for name in COLUMNS[1:]:
+        values = chunk[name][valid] if name in chunk.columns else pd.Series(None, index=events.index)
+        if name == "status_code":
+            values = pd.to_numeric(values, errors="coerce").astype("Int64")
+        elif name == "elapsed_ms":
+            values = pd.to_numeric(values, errors="coerce")
+        else:
+            values = values.astype(object)
+        events[name] = values
+    events["day"] = events["ts_ms"] // MS_PER_DAY
+    return events
+
+
+def has_source(path: Path, source: int) -> bool:
+    """True si la partición tiene eventos de la fuente `source` (usa idx_events_source)."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        if "source" not in [row[1] for row in conn.execute("PRAGMA table_info(events)")]:
+            return False
+        return conn.execute("SELECT 1 FROM events WHERE source = ? LIMIT 1", (source,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def ingest_source(store: Path, path: Path, source: int, chunk_size: int = INGEST_CHUNK):
+    """
+    Sustituye los eventos de la fuente `source` por los de `path`, cada uno en
+    la partición de su día. Cada partición tocada recibe una sola transacción
+    (borrado de los eventos anteriores de la fuente + inserción) y si algo
+    falla antes de los COMMIT se deshacen todas. Los COMMIT son por partición:
+    si uno falla a mitad, sources.json no se actualiza y volver a ingerir la
+    fuente la deja completa, porque primero borra lo que haya de ella.
+    Devuelve (filas insertadas, filas descartadas, días con eventos).
+    """
+    connections = {}
+    days = set()
+    rows = skipped = 0
+    columns = COLUMNS + ["source"]
+    insert = f"INSERT INTO events ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    def partition(day):
+        conn = connections.get(day)
+        if conn is None:
+            conn = connections[day] = open_partition(partition_path(store, day))
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM events WHERE source = ?", (source,))
+        return conn
+
+    try:
+        # Eventos de una ingesta anterior en días que esta vez quizá no aparezcan
+        for day, stored in list_partitions(store):
+            if has_source(stored, source):
+                partition(day)
+
+        for chunk in iter_source_chunks(path, chunk_size):
+            events = typed_events(chunk)
+            events["source"] = source
+            skipped += len(chunk) - len(events)
+            for day_number, group in events.groupby("day", sort=False):
+                day = pd.Timestamp(day_number * MS_PER_DAY, unit="ms").strftime("%Y-%m-%d")
+                conn = partition(day)
+                days.add(day)
+                values = group[columns].astype(object).where(group[columns].notna(), None)
+                conn.executemany(insert, values.itertuples(index=False, name=None))
+            rows += len(events)
+        for conn in connections.values():
+            for sql in CREATE_INDEXES:
+                conn.execute(sql)
+            conn.execute("COMMIT")
+    except BaseException:
+        for conn in connections.values():
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        raise
+    finally:
+        for conn in connections.values():
+            conn.close()
+    return rows, skipped, sorted(days)
+
+
+def ingest(store: Path, input_paths, chunk_size: int = INGEST_CHUNK, force: bool = False):
+    """
+    Ingesta en bloque de varias fuentes. Las que constan en sources.json sin
+    cambios se omiten (salvo con `force`); si una ruta ya ingerida cambió, sus
+    eventos se sustituyen.
+    """
+    store.mkdir(parents=True, exist_ok=True)
+    sources = load_sources(store)
+
+    for path in input_paths:
+        if not path.exists():
+            raise FileNotFoundError(f"No existe el input: {path.resolve()}")
+        identity = source_identity(path)
+        previous = [s for s in sources if s["identity"]["path"] == identity["path"]]
+        if any(s["identity"] == identity for s in previous) and not force:
+            print(f"🔖 Ya ingerido, se omite: {path}")
+            continue
+        if previous:
+            print(f"♻️ {path} ya se ingirió; se sustituyen sus eventos")
+
+        print(f"📖 Ingiriendo: {path.resolve()}")
+        started = time.perf_counter()
+        source = source_id(identity)
+        rows, skipped, days = ingest_source(store, path, source, chunk_size)
+        sources = [s for s in sources if s["identity"]["path"] != identity["path"]]
+        sources.append({
+            "identity": identity,
+            "source_id": source,
+            "rows": rows,
+            "skipped": skipped,
+            "days": [days[0], days[-1]] if days else [],
+            "ingested_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+        save_sources(store, sources)
+        print(f"✅ {rows:,} eventos en {len(days)} partición(es) en {time.perf_counter() - started:.2f}s"
+              + (f" ({skipped} descartados: sin timestamp válido o servidos desde caché)" if skipped else ""))
+
+
+# -----------------------------
+# Lectura para re-agregar
+# -----------------------------
+def iter_events(store: Path, date_from: str = None, date_to: str = None, chunk_size: int = INGEST_CHUNK):
+    """
+    DataFrames con las columnas del JSONL original (timestamp_utc, endpoint,
+    status_code, ...) leyendo solo las particiones de [date_from, date_to].
+    """
+    partitions = list_partitions(store, date_from, date_to)
+    if not partitions:
+        raise ValueError(f"No hay particiones en {store} para el rango {date_from or '...'} – {date_to or '...'}")
+    print(f"📖 {len(partitions)} partición(es): {partitions[0][0]} – {partitions[-1][0]}")
+    for _, path in partitions:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM events")
+            while True:
+                batch = cursor.fetchmany(chunk_size)
+                if not batch:
+                    break
+                df = pd.DataFrame.from_records(batch, columns=COLUMNS)
+                df.insert(0, "timestamp_utc", pd.to_datetime(df.pop("ts_ms"), unit="ms", utc=True))
+                yield df
+        finally:
+            conn.close()
+
+
+# -----------------------------
+# Mantenimiento
+# -----------------------------
+def prune(store: Path, before: str) -> int:
+    """Elimina las particiones anteriores a `before` (YYYY-MM-DD, exclusivo)."""
+    removed = 0
+    for day, path in list_partitions(store, date_to=before):
+        if day >= before:
+            continue
+        for p in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+            p.unlink(missing_ok=True)
+        removed += 1
+        print(f"🗑️ {day}")
+    print(f"✅ {removed} partición(es) eliminada(s) anteriores a {before}")
+    return removed
+
+
+def compact(store: Path, date_from: str = None, date_to: str = None):
+    """VACUUM de cada partición del rango (y vuelca el WAL al archivo principal)."""
+    before_total = after_total = 0
+    for day, path in list_partitions(store, date_from, date_to):
+        before = partition_size(path)
+        conn = sqlite3.connect(path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+        after = partition_size(path)
+        before_total += before
+        after_total += after
+        print(f"⚙️ {day}: {before / 1024:,.0f} KB → {after / 1024:,.0f} KB")
+    mb = 1024 * 1024
+    print(f"✅ Compactado: {before_total / mb:.1f} MB → {after_total / mb:.1f} MB")
+
+
+def describe(store: Path, date_from: str = None, date_to: str = None):
+    total = 0
+    for day, path in list_partitions(store, date_from, date_to):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+        total += rows
+        print(f"{day}  {rows:>12,} eventos  {partition_size(path) / 1024 / 1024:8.1f} MB")
+    print(f"✅ {total:,} eventos, {len(load_sources(store))} fuente(s) ingerida(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Almacén de eventos crudos particionado por día")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = commands.add_parser("ingest", help="Ingiere JSONL (.gz/.bz2/.xz/.zst) o .cols")
+    p_ingest.add_argument("--store", required=True, help="Directorio del almacén")
+    p_ingest.add_argument("--input", required=True, nargs="+", help="Archivo(s) de logs")
+    p_ingest.add_argument("--chunk-size", type=int, default=INGEST_CHUNK, help="Eventos por bloque")
+    p_ingest.add_argument("--force", action="store_true", help="Vuelve a ingerir aunque la fuente no haya cambiado (sustituye sus eventos)")
+
+    p_list = commands.add_parser("list", help="Particiones con su número de eventos y tamaño")
+    p_list.add_argument("--store", required=True)
+    p_list.add_argument("--date-from", help="YYYY-MM-DD (inclusive)")
+    p_list.add_argument("--date-to", help="YYYY-MM-DD (inclusive)")
+
+    p_prune = commands.add_parser("prune", help="Elimina particiones antiguas")
+    p_prune.add_argument("--store", required=True)
+    p_prune.add_argument("--before", required=True, help="YYYY-MM-DD: se borran los días anteriores")
+
+    p_compact = commands.add_parser("compact", help="VACUUM de las particiones del rango")
+    p_compact.add_argument("--store", required=True)
+    p_compact.add_argument("--date-from", help="YYYY-MM-DD (inclusive)")
+    p_compact.add_argument("--date-to", help="YYYY-MM-DD (inclusive)")
+
+    args = parser.parse_args()
+    store = Path(args.store)
+    try:
+        if args.command == "ingest":
+            ingest(store, [Path(p) for p in args.input], args.chunk_size, args.force)
+        elif args.command == "list":
+            describe(store, args.date_from, args.date_to)
+        elif args.command == "prune":
+            prune(store, args.before)
+        else:
+            compact(store, args.date_from, args.date_to)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        exit(1)
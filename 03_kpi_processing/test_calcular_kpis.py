@@ -0,0 +1,64 @@
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from calcular_kpis import main
+
+# Media exacta 1437.885: sumando en coma flotante por bloques de dos filas el
+# redondeo a dos decimales daba 1437.89 en lugar del 1437.88 de una sola pasada
+ELAPSED_MS = [1497.74, 1061.23, 2082.35, 1870.99, 934.83, 1180.17]
+
+
+def write_logs(path, elapsed_values, start=0):
+    with open(path, "a", encoding="utf-8") as f:
+        for i, elapsed in enumerate(elapsed_values, start):
+            f.write(json.dumps({
+                "timestamp_utc": f"2026-02-05T10:{i:02d}:00Z",
+                "endpoint": "/get",
+                "http_method": "GET",
+                "status_code": 200,
+                "elapsed_ms": elapsed,
+                "parse_result": "ok",
+                "user_agent": "test",
+            }) + "\n")
+
+
+class MergeOrderTest(unittest.TestCase):
+    """Serie, paralelo e incremental deben escribir exactamente el mismo CSV."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.logs = self.dir / "http_logs.jsonl"
+        write_logs(self.logs, ELAPSED_MS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, input_path, name, **kwargs):
+        output = self.dir / name
+        with redirect_stdout(StringIO()):
+            main(input_path, output, **kwargs)
+        return output.read_text(encoding="utf-8")
+
+    def test_parallel_matches_serial(self):
+        serial = self.run_main(self.logs, "serie.csv")
+        self.assertEqual(self.run_main(self.logs, "chunks.csv", chunk_size=2), serial)
+        self.assertEqual(self.run_main(self.logs, "paralelo.csv", chunk_size=2, workers=3), serial)
+
+    def test_incremental_matches_full(self):
+        full = self.run_main(self.logs, "completo.csv")
+        growing = self.dir / "creciente.jsonl"
+        write_logs(growing, ELAPSED_MS[:2])
+        self.run_main(growing, "incremental.csv", incremental_mode=True)
+        write_logs(growing, ELAPSED_MS[2:4], start=2)
+        self.run_main(growing, "incremental.csv", incremental_mode=True)
+        write_logs(growing, ELAPSED_MS[4:], start=4)
+        self.assertEqual(self.run_main(growing, "incremental.csv", incremental_mode=True, chunk_size=2), full)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+"""
+Carga directa de KPIs en SQLite (alternativa a t_load_kpi.ktr + t_load_fact_kpi.ktr).
+
+Toda la carga va en una sola transacción con WAL:
+1. Los KPIs se insertan con executemany en una tabla temporal.
+2. stg_kpi_endpoint_dia recibe un upsert set-based
+   (INSERT ... ON CONFLICT(date_utc, endpoint_base) DO UPDATE), sin truncar.
+3. fct_kpi_endpoint_dia se actualiza con el mismo upsert, pero solo para las
+   claves cargadas (join por la clave primaria), así el coste depende del
+   tamaño de la carga y no del histórico.
+4. Las tablas resumen de summary_tables.sql (diario global, endpoint a 30
+   días y alertas) se recalculan solo para las fechas cargadas, con el mismo
+   refresh_summaries.sql que ejecuta el job j_daily_kpi tras su carga.
+5. Se escribe una única fila en audit_etl_log por carga. El trigger por
+   fila trg_audit_fct_insert (auditoría de la carga de Pentaho) se quita
+   dentro de la transacción y se vuelve a crear antes del COMMIT, así que
+   fuera de ella sigue siempre activo.
+
+Uso:
+    python 04_etl_pentaho/cargar_kpis.py --input 03_kpi_processing/out/kpi_por_endpoint_dia.csv
+"""
+import argparse
+import getpass
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_INPUT = Path("03_kpi_processing/out/kpi_por_endpoint_dia.csv")
+DEFAULT_DB = Path("04_etl_pentaho/db/pipeline.db")
+SCHEMA_SQL = Path(__file__).with_name("create_tables.sql")
+SUMMARY_SQL = Path(__file__).with_name("summary_tables.sql")
+REFRESH_SQL = Path(__file__).with_name("refresh_summaries.sql")
+JOB_NAME = "cargar_kpis"
+
+STG_TABLE = "stg_kpi_endpoint_dia"
+FCT_TABLE = "fct_kpi_endpoint_dia"
+AUDIT_TABLE = "audit_etl_log"
+AUDIT_TRIGGER = "trg_audit_fct_insert"
+KEYS = ["date_utc", "endpoint_base"]
+# Columnas de timestamp de carga según el esquema (create_tables.sql / schema.sql)
+LOAD_TIMESTAMP_COLUMNS = ("created_at", "loaded_at")
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Conexión en modo autocommit (las transacciones se abren a mano) con WAL."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def ensure_schema(conn: sqlite3.Connection, schema_sql: Path = SCHEMA_SQL) -> bool:
+    """
+    Crea las tablas (y las tablas resumen) si faltan. Devuelve True si las
+    tablas resumen están vacías y hay que poblarlas con todo el histórico de fct.
+    """
+    if not table_columns(conn, STG_TABLE):
+        conn.executescript(schema_sql.read_text(encoding="utf-8"))
+    if not table_columns(conn, "sum_kpi_resumen_diario"):
+        conn.executescript(SUMMARY_SQL.read_text(encoding="utf-8"))
+    return conn.execute("SELECT 1 FROM sum_kpi_resumen_diario LIMIT 1").fetchone() is None
+
+
+def suspend_trigger(conn: sqlite3.Connection, name: str = AUDIT_TRIGGER):
+    """
+    Quita el trigger `name` y devuelve su CREATE TRIGGER para restaurarlo (o
+    None si no existe). Debe llamarse dentro de una transacción: el DDL de
+    SQLite es transaccional y ninguna otra conexión ve el trigger ausente.
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+    if row is None:
+        return None
+    conn.execute(f"DROP TRIGGER {name}")
+    return row[0]
+
+
+def sql_statements(path: Path) -> list:
+    """
+    Sentencias de un script SQL, una a una: executescript haría COMMIT de la
+    transacción abierta antes de ejecutarlo.
+    """
+    statements, pending = [], ""
+    for line in path.read_text(encoding="utf-8").splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            statements.append(pending.strip())
+            pending = ""
+    return statements
+
+
+def refresh_summaries(conn: sqlite3.Connection, source: str = "tmp_kpi"):
+    """
+    Recalcula las tablas resumen para las fechas presentes en `source`
+    (tmp_kpi durante una carga, fct_kpi_endpoint_dia para reconstruir todo).
+    Devuelve el número de fechas refrescadas.
+    """
+    conn.execute(f"CREATE TEMP TABLE tmp_dates AS SELECT DISTINCT date_utc FROM {source}")
+    dates = conn.execute("SELECT COUNT(*) FROM tmp_dates").fetchone()[0]
+    for sql in sql_statements(REFRESH_SQL):
+        conn.execute(sql)
+    return dates
+
+
+def prepare_rows(kpis: pd.DataFrame, columns: list):
+    """
+    Filas listas para executemany con las columnas de KPIs que existen en la
+    tabla (p50/p95/p99 se ignoran si el esquema solo tiene p90). Devuelve
+    (filas, rechazadas): sin clave o con requests_total <= 0 se rechazan.
+    """
+    missing = set(KEYS + ["requests_total"]) - set(kpis.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas en los KPIs: {sorted(missing)}")
+    df = kpis[[c for c in columns if c in kpis.columns]].copy()
+    valid = df[KEYS].notna().all(axis=1) & (pd.to_numeric(df["requests_total"], errors="coerce") > 0)
+    df = df[valid]
+    df["date_utc"] = pd.to_datetime(df["date_utc"]).dt.strftime("%Y-%m-%d")
+    values = [c for c in df.columns if c not in KEYS]
+    df[values] = df[values].fillna(0)
+    return df, int((~valid).sum())
+
+
+def upsert_sql(table: str, columns: list, source: str, table_cols: list) -> str:
+    """INSERT ... SELECT con upsert por (date_utc, endpoint_base) desde `source`."""
+    stamp = [c for c in LOAD_TIMESTAMP_COLUMNS if c in table_cols]
+    updates = [f"{c} = excluded.{c}" for c in columns if c not in KEYS]
+    updates += [f"{c} = CURRENT_TIMESTAMP" for c in stamp]
+    cols = ", ".join(columns)
+    # "WHERE true" evita la ambigüedad del parser entre ON (join) y ON CONFLICT
+    return (f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {source} WHERE true "
+            f"ON CONFLICT(date_utc, endpoint_base) DO UPDATE SET {', '.join(updates)}")
+
+
+def write_audit(conn: sqlite3.Connection, stats: dict):
+    """Una fila de auditoría por carga, con las columnas que tenga la tabla."""
+    available = set(table_columns(conn, AUDIT_TABLE))
+    values = {
+        "job_name": JOB_NAME,
+        "transformation_name": "upsert stg/fct",
+        "execution_start": stats["started_at"],
+        "execution_date": stats["started_at"],
+        "execution_end": stats["finished_at"],
+        "status": stats["status"],
+        "records_loaded": stats["loaded"],
+        "records_expected": stats["expected"],
+        "records_processed": stats["expected"],
+        "records_inserted": stats["inserted"],
+        "records_updated": stats["updated"],
+        "records_rejected": stats["rejected"],
+        "error_message": stats.get("error"),
+        "duration_seconds": round(stats["duration"], 3),
+        "executed_by": getpass.getuser(),
+    }
+    values = {k: v for k, v in values.items() if k in available}
+    conn.execute(
+        f"INSERT INTO {AUDIT_TABLE} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+        list(values.values()),
+    )
+
+
+def load_kpis(kpis: pd.DataFrame, db_path: Path = DEFAULT_DB, schema_sql: Path = SCHEMA_SQL) -> dict:
+    """
+    Carga la salida de compute_kpis (o el CSV de KPIs) en staging y fact.
+    Devuelve las estadísticas de la carga (las mismas que quedan en la auditoría).
+    """
+    started = time.perf_counter()
+    stats = {
+        "started_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "expected": len(kpis), "loaded": 0, "inserted": 0, "updated": 0, "rejected": 0,
+    }
+    conn = connect(db_path)
+    try:
+        rebuild = ensure_schema(conn, schema_sql)
+        stg_cols, fct_cols = table_columns(conn, STG_TABLE), table_columns(conn, FCT_TABLE)
+        columns = [c for c in stg_cols if c in kpis.columns]
+        rows, stats["rejected"] = prepare_rows(kpis, columns)
+        columns = list(rows.columns)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"CREATE TEMP TABLE tmp_kpi AS SELECT {', '.join(columns)} FROM {STG_TABLE} WHERE 0")
+            conn.execute("CREATE UNIQUE INDEX temp.idx_tmp_kpi ON tmp_kpi(date_utc, endpoint_base)")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO tmp_kpi ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows.itertuples(index=False, name=None),
+            )
+            stats["loaded"] = conn.execute("SELECT COUNT(*) FROM tmp_kpi").fetchone()[0]
+            stats["updated"] = conn.execute(
+                f"SELECT COUNT(*) FROM tmp_kpi t JOIN {STG_TABLE} s USING (date_utc, endpoint_base)"
+            ).fetchone()[0]
+            stats["inserted"] = stats["loaded"] - stats["updated"]
+
+            conn.execute(upsert_sql(STG_TABLE, columns, "tmp_kpi", stg_cols))
+            fct_columns = [c for c in columns if c in fct_cols]
+            fct_source = (f"(SELECT {', '.join('s.' + c for c in fct_columns)} FROM tmp_kpi t "
+                          f"JOIN {STG_TABLE} s USING (date_utc, endpoint_base))")
+            # Sin el trigger por fila: la auditoría de esta carga es la fila de write_audit
+            trigger_sql = suspend_trigger(conn)
+            conn.execute(upsert_sql(FCT_TABLE, fct_columns, fct_source, fct_cols))
+            if trigger_sql:
+                conn.execute(trigger_sql)
+            stats["summary_dates"] = refresh_summaries(conn, FCT_TABLE if rebuild else "tmp_kpi")
+            conn.execute("DROP TABLE tmp_kpi")
+
+            stats["status"] = "SUCCESS" if not stats["rejected"] else "PARTIAL"
+            stats["finished_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            stats["duration"] = time.perf_counter() - started
+            write_audit(conn, stats)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except Exception as e:
+        # La carga no deja datos a medias; se registra el fallo en su propia transacción
+        stats.update(status="FAILED", error=str(e), loaded=0, inserted=0, updated=0,
+                     finished_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                     duration=time.perf_counter() - started)
+        if table_columns(conn, AUDIT_TABLE):
+            write_audit(conn, stats)
+        raise
+    finally:
+        conn.close()
+    return stats
+
+
+def main(input_path: Path, db_path: Path):
+    if not input_path.exists():
+        raise FileNotFoundError(f"No existe el CSV de KPIs: {input_path.resolve()}")
+    print(f"📖 Leyendo: {input_path.resolve()}")
+    kpis = pd.read_csv(input_path, dtype={"endpoint_base": object})
+    stats = load_kpis(kpis, db_path)
+    print(f"✅ Base de datos: {db_path.resolve()}")
+    print(f"✅ {stats['loaded']} filas cargadas ({stats['inserted']} nuevas, {stats['updated']} actualizadas, "
+          f"{stats['rejected']} rechazadas) en {stats['duration']:.2f}s [{stats['status']}]")
+    print(f"✅ Tablas resumen refrescadas para {stats['summary_dates']} fecha(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga el CSV de KPIs en las tablas stg/fct de SQLite")
+    parser.add_argument("--input", type=str, default=str(DEFAULT_INPUT),
+                        help=f"CSV de KPIs (default: {DEFAULT_INPUT})")
+    parser.add_argument("--db", type=str, default=str(DEFAULT_DB),
+                        help=f"Base de datos SQLite (default: {DEFAULT_DB})")
+    args = parser.parse_args()
+
+    try:
+        main(Path(args.input), Path(args.db))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        exit(1)
@@ -108,7 +108,9 @@ ORDER BY p90_elapsed_ms DESC;
 
 -- En SQLite usamos triggers en lugar de procedures
 
--- Trigger: Auditar inserciones en fact table
+-- Trigger: Auditar inserciones en fact table (carga de Pentaho, j_daily_kpi).
+-- cargar_kpis.py lo desactiva solo dentro de su transacción y registra una
+-- única fila de auditoría por carga.
 CREATE TRIGGER IF NOT EXISTS trg_audit_fct_insert
 AFTER INSERT ON fct_kpi_endpoint_dia
 BEGIN
@@ -0,0 +1,79 @@
+-- =============================================================================
+-- Refresco de las tablas resumen de summary_tables.sql
+-- Base de datos: SQLite
+-- =============================================================================
+-- Recalcula las fechas de la tabla temporal tmp_dates:
+--   * cargar_kpis.py la crea antes con las fechas de la carga (refresco incremental).
+--   * El job j_daily_kpi lo ejecuta tal cual después de t_load_fact_kpi, que
+--     trunca y recarga fct_kpi_endpoint_dia: antes aplica summary_tables.sql
+--     (crea las tablas si faltan) y vacía las tablas resumen, y sin tmp_dates
+--     aquí se recalculan todas las fechas de fct. Así no quedan resúmenes de
+--     fechas que ya no están en fct.
+-- Todos los filtros sobre fct son por date_utc (IN / BETWEEN), así usan
+-- idx_fct_date_cover.
+
+CREATE TEMP TABLE IF NOT EXISTS tmp_dates AS
+SELECT DISTINCT date_utc FROM fct_kpi_endpoint_dia;
+
+DELETE FROM sum_kpi_resumen_diario WHERE date_utc IN (SELECT date_utc FROM tmp_dates);
+
+INSERT INTO sum_kpi_resumen_diario
+SELECT
+  date_utc,
+  COUNT(DISTINCT endpoint_base),
+  SUM(requests_total),
+  SUM(success_2xx),
+  SUM(client_4xx),
+  SUM(server_5xx),
+  SUM(parse_errors),
+  ROUND(AVG(avg_elapsed_ms), 2),
+  MAX(p90_elapsed_ms)
+FROM fct_kpi_endpoint_dia
+WHERE date_utc IN (SELECT date_utc FROM tmp_dates)
+GROUP BY date_utc;
+
+DELETE FROM sum_alertas_rendimiento WHERE date_utc IN (SELECT date_utc FROM tmp_dates);
+
+INSERT INTO sum_alertas_rendimiento
+SELECT
+  date_utc,
+  endpoint_base,
+  p90_elapsed_ms,
+  CASE
+    WHEN p90_elapsed_ms > 500 THEN 'CRITICO'
+    WHEN p90_elapsed_ms > 300 THEN 'WARNING'
+    ELSE 'OK'
+  END,
+  success_2xx,
+  client_4xx + server_5xx,
+  ROUND(100.0 * (client_4xx + server_5xx) / requests_total, 2)
+FROM fct_kpi_endpoint_dia
+WHERE date_utc IN (SELECT date_utc FROM tmp_dates)
+  AND (p90_elapsed_ms > 300 OR (client_4xx + server_5xx) > requests_total * 0.1);
+
+-- Una fecha cargada cambia la ventana de 30 días de esa fecha y de las 29 siguientes
+CREATE TEMP TABLE tmp_rolling AS
+SELECT DISTINCT s.date_utc
+FROM tmp_dates t
+JOIN sum_kpi_resumen_diario s
+  ON s.date_utc BETWEEN t.date_utc AND date(t.date_utc, '+29 days');
+
+DELETE FROM sum_kpi_endpoint_30d WHERE date_utc IN (SELECT date_utc FROM tmp_rolling);
+
+INSERT INTO sum_kpi_endpoint_30d
+SELECT
+  r.date_utc,
+  f.endpoint_base,
+  COUNT(*),
+  SUM(f.requests_total),
+  SUM(f.success_2xx),
+  ROUND(100.0 * SUM(f.success_2xx) / SUM(f.requests_total), 2),
+  ROUND(AVG(f.avg_elapsed_ms), 2),
+  ROUND(AVG(f.p90_elapsed_ms), 2)
+FROM tmp_rolling r
+JOIN fct_kpi_endpoint_dia f
+  ON f.date_utc BETWEEN date(r.date_utc, '-29 days') AND r.date_utc
+GROUP BY r.date_utc, f.endpoint_base;
+
+DROP TABLE tmp_rolling;
+DROP TABLE tmp_dates;
@@ -71,54 +71,11 @@ CREATE INDEX IF NOT EXISTS idx_audit_job ON audit_etl_log(job_name);
 CREATE INDEX IF NOT EXISTS idx_audit_status ON audit_etl_log(status);
 CREATE INDEX IF NOT EXISTS idx_audit_execution_start ON audit_etl_log(execution_start);
 
--- Vista: Resumen diario de KPIs por fecha
-CREATE VIEW IF NOT EXISTS vw_kpi_resumen_diario AS
-SELECT 
-  date_utc,
-  COUNT(DISTINCT endpoint_base) as num_endpoints,
-  SUM(requests_total) as total_requests_dia,
-  SUM(success_2xx) as total_success_2xx,
-  SUM(client_4xx) as total_client_4xx,
-  SUM(server_5xx) as total_server_5xx,
-  SUM(parse_errors) as total_parse_errors,
-  ROUND(AVG(avg_elapsed_ms), 2) as promedio_latencia,
-  MAX(p90_elapsed_ms) as max_p90_latencia
-FROM fct_kpi_endpoint_dia
-GROUP BY date_utc
-ORDER BY date_utc DESC;
-
--- Vista: KPIs por endpoint (últimas 30 días)
-CREATE VIEW IF NOT EXISTS vw_kpi_por_endpoint AS
-SELECT 
-  endpoint_base,
-  COUNT(DISTINCT date_utc) as dias_data,
-  SUM(requests_total) as total_requests,
-  SUM(success_2xx) as total_success,
-  ROUND(100.0 * SUM(success_2xx) / SUM(requests_total), 2) as success_rate_pct,
-  ROUND(AVG(avg_elapsed_ms), 2) as avg_latencia,
-  ROUND(AVG(p90_elapsed_ms), 2) as avg_p90_latencia
-FROM fct_kpi_endpoint_dia
-WHERE date(loaded_at) >= date('now', '-30 days')
-GROUP BY endpoint_base
-ORDER BY total_requests DESC;
-
--- Vista: Alertas de rendimiento
-CREATE VIEW IF NOT EXISTS vw_alertas_rendimiento AS
-SELECT 
-  date_utc,
-  endpoint_base,
-  p90_elapsed_ms,
-  CASE 
-    WHEN p90_elapsed_ms > 500 THEN 'CRITICO'
-    WHEN p90_elapsed_ms > 300 THEN 'WARNING'
-    ELSE 'OK'
-  END as nivel_alerta,
-  success_2xx,
-  client_4xx + server_5xx as total_errores,
-  ROUND(100.0 * (client_4xx + server_5xx) / requests_total, 2) as error_rate_pct
-FROM fct_kpi_endpoint_dia
-WHERE (p90_elapsed_ms > 300 OR (client_4xx + server_5xx) > requests_total * 0.1)
-ORDER BY date_utc DESC, p90_elapsed_ms DESC;
+-- Vistas vw_kpi_resumen_diario, vw_kpi_por_endpoint y vw_alertas_rendimiento:
+-- se definen en summary_tables.sql sobre tablas resumen que se refrescan en
+-- cada carga (refresh_summaries.sql, desde cargar_kpis.py o el job
+-- j_daily_kpi), en lugar de reagregar toda la fact table en cada consulta:
+--   sqlite3 04_etl_pentaho/db/pipeline.db < 04_etl_pentaho/summary_tables.sql
 
 -- =============================================================================
 -- SCRIPTS DE VALIDACION
@@ -0,0 +1,91 @@
+-- =============================================================================
+-- Tablas resumen materializadas para reportes y dashboards
+-- Base de datos: SQLite (sirve con schema.sql o con create_tables.sql)
+-- =============================================================================
+-- Las vistas vw_* antes reagregaban toda fct_kpi_endpoint_dia en cada consulta.
+-- Ahora leen tablas resumen que refresh_summaries.sql recalcula tras cada carga:
+-- cargar_kpis.py en la misma transacción y solo para las fechas tocadas, y el
+-- job j_daily_kpi (entradas "Crear resumenes", "Vaciar resumenes" y
+-- "Refrescar resumenes") reconstruyéndolas para todas las fechas de fct.
+-- Este script es idempotente: el job lo aplica en cada ejecución.
+-- Filas que se recalculan:
+--   sum_kpi_resumen_diario  → fechas cargadas
+--   sum_alertas_rendimiento → fechas cargadas
+--   sum_kpi_endpoint_30d    → fechas cargadas y los 29 días siguientes (ventana móvil)
+-- Las consultas a las vistas cuestan lo mismo sin importar el histórico.
+
+-- Índice cubriente: los refrescos leen fct por rango de fechas sin tocar la tabla
+CREATE INDEX IF NOT EXISTS idx_fct_date_cover ON fct_kpi_endpoint_dia(
+  date_utc, endpoint_base, requests_total, success_2xx, client_4xx, server_5xx,
+  parse_errors, avg_elapsed_ms, p90_elapsed_ms
+);
+
+-- Resumen diario global (una fila por fecha)
+CREATE TABLE IF NOT EXISTS sum_kpi_resumen_diario (
+  date_utc TEXT PRIMARY KEY,
+  num_endpoints INTEGER NOT NULL,
+  total_requests_dia INTEGER NOT NULL,
+  total_success_2xx INTEGER NOT NULL,
+  total_client_4xx INTEGER NOT NULL,
+  total_server_5xx INTEGER NOT NULL,
+  total_parse_errors INTEGER NOT NULL,
+  promedio_latencia REAL,
+  max_p90_latencia REAL
+) WITHOUT ROWID;
+
+-- Cifras por endpoint en los 30 días que terminan en date_utc (inclusive)
+CREATE TABLE IF NOT EXISTS sum_kpi_endpoint_30d (
+  date_utc TEXT NOT NULL,
+  endpoint_base TEXT NOT NULL,
+  dias_data INTEGER NOT NULL,
+  total_requests INTEGER NOT NULL,
+  total_success INTEGER NOT NULL,
+  success_rate_pct REAL,
+  avg_latencia REAL,
+  avg_p90_latencia REAL,
+  PRIMARY KEY (date_utc, endpoint_base)
+) WITHOUT ROWID;
+
+-- Alertas de rendimiento por endpoint y día
+CREATE TABLE IF NOT EXISTS sum_alertas_rendimiento (
+  date_utc TEXT NOT NULL,
+  endpoint_base TEXT NOT NULL,
+  p90_elapsed_ms REAL,
+  nivel_alerta TEXT NOT NULL,
+  success_2xx INTEGER,
+  total_errores INTEGER,
+  error_rate_pct REAL,
+  PRIMARY KEY (date_utc, endpoint_base)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_sum_alertas_orden ON sum_alertas_rendimiento(date_utc DESC, p90_elapsed_ms DESC);
+
+-- =============================================================================
+-- Vistas (mismas columnas que antes, ahora sobre las tablas resumen)
+-- =============================================================================
+DROP VIEW IF EXISTS vw_kpi_resumen_diario;
+CREATE VIEW vw_kpi_resumen_diario AS
+SELECT *
+FROM sum_kpi_resumen_diario
+ORDER BY date_utc DESC;
+
+-- Últimos 30 días de datos (hasta la fecha más reciente cargada)
+DROP VIEW IF EXISTS vw_kpi_por_endpoint;
+CREATE VIEW vw_kpi_por_endpoint AS
+SELECT
+  endpoint_base,
+  dias_data,
+  total_requests,
+  total_success,
+  success_rate_pct,
+  avg_latencia,
+  avg_p90_latencia
+FROM sum_kpi_endpoint_30d
+WHERE date_utc = (SELECT MAX(date_utc) FROM sum_kpi_resumen_diario)
+ORDER BY total_requests DESC;
+
+DROP VIEW IF EXISTS vw_alertas_rendimiento;
+CREATE VIEW vw_alertas_rendimiento AS
+SELECT *
+FROM sum_alertas_rendimiento
+ORDER BY date_utc DESC, p90_elapsed_ms DESC;
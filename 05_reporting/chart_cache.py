@@ -0,0 +1,75 @@
+"""
+Caché de gráficos del reporte direccionada por contenido.
+
+Cada PNG se guarda como `<sha256>.png`, donde el hash cubre el nombre del
+gráfico, el trozo de datos que dibuja, sus parámetros (p. ej. el umbral P90) y
+la versión de matplotlib. Si nada de eso cambia, el PNG se reutiliza tal cual.
+El directorio se limita por tamaño: al superarlo se borran los PNG usados hace
+más tiempo (cada acierto actualiza el mtime del archivo).
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+
+# Subir al cambiar el dibujo de algún gráfico para invalidar la caché
+CACHE_VERSION = 1
+
+
+def chart_key(name: str, data: pd.DataFrame, params: dict) -> str:
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}|{matplotlib.__version__}|{name}|".encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    h.update(data.to_csv(index=False).encode())
+    return h.hexdigest()
+
+
+class ChartCache:
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.png"
+
+    def get(self, key: str):
+        """PNG en caché o None; un acierto lo marca como usado recientemente."""
+        path = self.path(key)
+        try:
+            png = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return png
+
+    def put(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f"{key}.png.tmp"
+        tmp.write_bytes(png)
+        os.replace(tmp, self.path(key))
+
+    def evict(self, keep=()) -> int:
+        """Borra los PNG menos usados hasta quedar bajo max_bytes; devuelve cuántos."""
+        if not self.directory.exists():
+            return 0
+        entries = sorted((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*.png"))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path.stem in keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
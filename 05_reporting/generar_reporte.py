@@ -1,17 +1,124 @@
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # backend no interactivo: solo se generan PNG (también en los procesos del pool)
 import matplotlib.pyplot as plt
 import argparse
 import base64
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from pathlib import Path
 from datetime import datetime
 
-def fig_to_base64(fig):
-    """Convierte gráficos de matplotlib a base64 para evitar depender de archivos externos."""
+from chart_cache import ChartCache, chart_key
+
+def fig_to_png(fig):
     buf = BytesIO()
     fig.savefig(buf, format='png', bbox_inches='tight', dpi=100)
     plt.close(fig)
-    return base64.b64encode(buf.getvalue()).decode('utf-8')
+    return buf.getvalue()
+
+def fig_to_base64(fig):
+    """Convierte gráficos de matplotlib a base64 para evitar depender de archivos externos."""
+    return base64.b64encode(fig_to_png(fig)).decode('utf-8')
+
+# -----------------------------
+# Gráficos: cada uno recibe solo su trozo de datos (clave de la caché)
+# -----------------------------
+def plot_volumen(data, params):
+    # 1. Gráfico de Barras: Volumen
+    fig, ax = plt.subplots(figsize=(7, 4))
+    data.plot.barh(x='endpoint_base', y='requests_total', ax=ax, color='#2c3e50')
+    ax.set_title("Volumen por Endpoint", fontsize=10)
+    return fig
+
+def plot_p90(data, params):
+    # 2. Gráfico de Barras: P90 vs Umbral
+    fig, ax = plt.subplots(figsize=(7, 4))
+    data.plot.bar(x='endpoint_base', y='p90_elapsed_ms', ax=ax, color='#3498db')
+    ax.axhline(y=params['umbral_p90'], color='#e74c3c', linestyle='--', label='Umbral')
+    ax.set_title("Performance P90 (ms)", fontsize=10)
+    return fig
+
+def plot_errores(data, params):
+    # 3. Gráfico Circular: Proporción Global
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.pie(data.iloc[0].tolist(), labels=['Ok', 'Client Err', 'Server Err'], autopct='%1.1f%%',
+           colors=['#27ae60', '#f1c40f', '#e74c3c'])
+    return fig
+
+def plot_latencias(data, params):
+    # 4. Histograma/Boxplot de Latencias
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.boxplot(data['p90_elapsed_ms'], vert=False)
+    ax.set_title("Distribución de Latencias P90", fontsize=10)
+    return fig
+
+CHARTS = {
+    'volumen': plot_volumen,
+    'p90': plot_p90,
+    'errores': plot_errores,
+    'latencias': plot_latencias,
+}
+
+def chart_specs(df, umbral):
+    """(nombre, datos, parámetros) de los cuatro gráficos, en el orden del HTML."""
+    errores = pd.DataFrame([{
+        'success_2xx': df['success_2xx'].sum(),
+        'client_4xx': df['client_4xx'].sum(),
+        'server_5xx': df['server_5xx'].sum(),
+    }])
+    return [
+        ('volumen', df.sort_values('requests_total').tail(10)[['endpoint_base', 'requests_total']], {}),
+        ('p90', df.head(10)[['endpoint_base', 'p90_elapsed_ms']], {'umbral_p90': umbral}),
+        ('errores', errores, {}),
+        ('latencias', df[['p90_elapsed_ms']], {}),
+    ]
+
+def render_chart(name, data, params):
+    """Dibuja un gráfico y devuelve el PNG (se ejecuta en el pool de procesos)."""
+    with plt.style.context('ggplot'):
+        return fig_to_png(CHARTS[name](data, params))
+
+def render_charts(specs, cache, workers):
+    """
+    PNG en base64 de cada gráfico: los que están en caché se leen del disco y
+    el resto se dibuja en un pool de procesos (o en este proceso si es uno solo).
+    """
+    keys = [chart_key(name, data, params) for name, data, params in specs]
+    pngs = [cache.get(key) if cache else None for key in keys]
+    missing = [i for i, png in enumerate(pngs) if png is None]
+
+    workers = workers or min(len(missing), os.cpu_count() or 1)
+    if len(missing) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {i: pool.submit(render_chart, *specs[i]) for i in missing}
+            for i, future in futures.items():
+                pngs[i] = future.result()
+    else:
+        for i in missing:
+            pngs[i] = render_chart(*specs[i])
+
+    if cache:
+        for i in missing:
+            cache.put(keys[i], pngs[i])
+        cache.evict(keep=set(keys))
+    return [base64.b64encode(png).decode('utf-8') for png in pngs], len(missing)
+
+def sketch_quantile(sketch_csv, q):
+    """
+    Cuantil global combinando los sketches diarios (*.sketch.csv) que escribe
+    calcular_kpis: se suman los conteos por bucket de todos los días/endpoints.
+    Devuelve None si el sketch no tiene observaciones.
+    """
+    sketch = pd.read_csv(sketch_csv, usecols=['value_ms', 'count'])
+    merged = sketch.groupby('value_ms')['count'].sum().sort_index()
+    merged = merged[merged > 0]
+    if merged.empty:
+        return None
+    cumulative = merged.cumsum()
+    return float(merged.index[cumulative.searchsorted(q * (cumulative.iloc[-1] - 1), side='right')])
 
 def generar_html(df, plots_base64, stats, output_path, umbral, autor):
     now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
@@ -88,7 +195,7 @@ def generar_html(df, plots_base64, stats, output_path, umbral, autor):
         <div class="stats-container">
             <div class="stat-card"><h3>Total Solicitudes</h3><p>{stats['total_req']:,}</p></div>
             <div class="stat-card"><h3>Tasa Éxito (2xx)</h3><p>{stats['success_rate']:.2f}%</p></div>
-            <div class="stat-card"><h3>Global P90</h3><p>{stats['global_p90']:.1f} ms</p></div>
+            <div class="stat-card"><h3>Global P90</h3><p>{'n/d' if pd.isna(stats['global_p90']) else f"{stats['global_p90']:.1f} ms"}</p></div>
             <div class="stat-card"><h3>Total Incidencias</h3><p>{stats['total_err']:,}</p></div>
         </div>
 
@@ -127,6 +234,9 @@ def main():
     parser.add_argument("--output", default="05_reporting/out/report/kpi_diario.html")
     parser.add_argument("--umbral_p90", type=float, default=300.0)
     parser.add_argument("--autor", default="Milton Quiñonez") 
+    parser.add_argument("--cache-dir", default="05_reporting/out/.chart_cache", help="Directorio de la caché de gráficos")
+    parser.add_argument("--cache-max-mb", type=float, default=50.0, help="Tamaño máximo de la caché (0 = sin caché)")
+    parser.add_argument("--workers", type=int, default=0, help="Procesos para renderizar gráficos (0 = automático)")
     args = parser.parse_args()
 
     # Verificación de Carpeta de Salida
@@ -138,43 +248,29 @@ def main():
         return
 
     df = pd.read_csv(args.input)
+
+    # P90 global real desde los sketches; sin sidecar (CSVs antiguos) o con el
+    # sketch vacío se usa la media de p90
+    input_path = Path(args.input)
+    sketch_csv = input_path.with_name(f"{input_path.stem}.sketch.csv")
+    global_p90 = sketch_quantile(sketch_csv, 0.9) if sketch_csv.exists() else None
+    if global_p90 is None:
+        global_p90 = df['p90_elapsed_ms'].mean()
     
     # Cálculos globales para los cuadros superiores
     stats = {
         'total_req': df['requests_total'].sum(),
         'success_rate': (df['success_2xx'].sum() / df['requests_total'].sum() * 100),
-        'global_p90': df['p90_elapsed_ms'].mean(),
+        'global_p90': global_p90,
         'total_err': df['client_4xx'].sum() + df['server_5xx'].sum()
     }
 
-    # Configuración de estilo para los gráficos
-    plt.style.use('ggplot')
-    plots = []
-    
-    # 1. Gráfico de Barras: Volumen
-    fig1, ax1 = plt.subplots(figsize=(7, 4))
-    df.sort_values('requests_total').tail(10).plot.barh(x='endpoint_base', y='requests_total', ax=ax1, color='#2c3e50')
-    ax1.set_title("Volumen por Endpoint", fontsize=10)
-    plots.append(fig_to_base64(fig1))
-
-    # 2. Gráfico de Barras: P90 vs Umbral
-    fig2, ax2 = plt.subplots(figsize=(7, 4))
-    df.head(10).plot.bar(x='endpoint_base', y='p90_elapsed_ms', ax=ax2, color='#3498db')
-    ax2.axhline(y=args.umbral_p90, color='#e74c3c', linestyle='--', label='Umbral')
-    ax2.set_title("Performance P90 (ms)", fontsize=10)
-    plots.append(fig_to_base64(fig2))
-
-    # 3. Gráfico Circular: Proporción Global
-    fig3, ax3 = plt.subplots(figsize=(7, 4))
-    ax3.pie([df['success_2xx'].sum(), df['client_4xx'].sum(), df['server_5xx'].sum()], 
-            labels=['Ok', 'Client Err', 'Server Err'], autopct='%1.1f%%', colors=['#27ae60', '#f1c40f', '#e74c3c'])
-    plots.append(fig_to_base64(fig3))
-
-    # 4. Histograma/Boxplot de Latencias
-    fig4, ax4 = plt.subplots(figsize=(7, 4))
-    ax4.boxplot(df['p90_elapsed_ms'], vert=False)
-    ax4.set_title("Distribución de Latencias P90", fontsize=10)
-    plots.append(fig_to_base64(fig4))
+    # Gráficos: caché por contenido + render en paralelo de los que falten
+    started = time.perf_counter()
+    cache = ChartCache(Path(args.cache_dir), int(args.cache_max_mb * 1024 * 1024)) if args.cache_max_mb > 0 else None
+    plots, rendered = render_charts(chart_specs(df, args.umbral_p90), cache, args.workers)
+    print(f"Gráficos: {len(plots)} ({len(plots) - rendered} desde caché, {rendered} renderizados) "
+          f"en {time.perf_counter() - started:.2f}s")
 
     generar_html(df, plots, stats, args.output, args.umbral_p90, args.autor)
     print(f"Reporte generado con éxito en: {args.output}")
@@ -21,6 +21,7 @@ REQUIRED_MODULES = {
     "pandas": "pandas>=2.0.0",
     "numpy": "numpy>=1.24.0",
     "matplotlib": "matplotlib>=3.7.0",
+    "logformat": "-e ./00_common",
 }
 
 REQUIRED_DIRS = [